@@ -0,0 +1,149 @@
+"""
+bench_scheduling.py
+
+Microbenchmark do agendamento de eventos das aplicações na timeline do SeQUeNCe.
+
+Compara o padrão atual (`Event(t, Process(obj, "nome_do_metodo", args))`,
+resolvido via `getattr` na execução) com o `AppScheduler` (eventos com
+referência direta ao método, reaproveitados de um pool), agendando um a um e
+em lote. Dois cenários são medidos:
+
+- independentes: N prazos agendados de uma vez e depois executados;
+- encadeados: C cadeias em que cada evento agenda o próximo (rodadas); aqui
+  o agendamento ocorre durante a execução e só a taxa de execução é reportada.
+
+Uso:
+    python -m benchmarks.bench_scheduling --events 200000 --chains 100
+"""
+
+import argparse
+import random
+import time
+
+from sequence.kernel.event import Event
+from sequence.kernel.process import Process
+from sequence.kernel.timeline import Timeline
+
+from qsn.utils.scheduling import AppScheduler
+
+
+class _Target:
+    """Aplicação mínima: conta as chamadas e, se encadeada, reagenda a si mesma."""
+
+    def __init__(self, timeline, scheduler=None, remaining=0):
+        self.timeline = timeline
+        self.scheduler = scheduler
+        self.remaining = remaining
+        self.calls = 0
+
+    def deadline(self, sensor_index):
+        self.calls += 1
+
+    def round_with_process(self):
+        self.calls += 1
+        if self.remaining > 0:
+            self.remaining -= 1
+            process = Process(self, "round_with_process", [])
+            self.timeline.schedule(Event(self.timeline.now() + 1000, process))
+
+    def round_with_scheduler(self):
+        self.calls += 1
+        if self.remaining > 0:
+            self.remaining -= 1
+            self.scheduler.schedule(self.timeline.now() + 1000, self.round_with_scheduler)
+
+
+def _measure(setup, n_events, rescheduling=False):
+    """Executa `setup` (que agenda os eventos) e a timeline; retorna eventos/s de agendamento e execução.
+
+    Com `rescheduling`, os eventos são agendados durante a execução e só a taxa de execução é retornada.
+    """
+    tl = Timeline()
+    t0 = time.perf_counter()
+    target = setup(tl)
+    t1 = time.perf_counter()
+    tl.init()
+    tl.run()
+    t2 = time.perf_counter()
+    assert target.calls == n_events, (target.calls, n_events)
+    return (None if rescheduling else n_events / (t1 - t0)), n_events / (t2 - t1)
+
+
+def independent(n_events, seed):
+    rng = random.Random(seed)
+    times = [rng.randrange(1, 10 ** 12) for _ in range(n_events)]
+
+    def with_process(tl):
+        target = _Target(tl)
+        for i, t in enumerate(times):
+            tl.schedule(Event(t, Process(target, "deadline", [i])))
+        return target
+
+    def with_scheduler(tl):
+        target = _Target(tl)
+        scheduler = AppScheduler(tl)
+        for i, t in enumerate(times):
+            scheduler.schedule(t, target.deadline, i)
+        return target
+
+    def with_schedule_many(tl):
+        target = _Target(tl)
+        AppScheduler(tl).schedule_many((t, target.deadline, i) for i, t in enumerate(times))
+        return target
+
+    return {
+        "Event+Process": _measure(with_process, n_events),
+        "AppScheduler.schedule": _measure(with_scheduler, n_events),
+        "AppScheduler.schedule_many": _measure(with_schedule_many, n_events),
+    }
+
+
+def chained(n_events, n_chains):
+    rounds = n_events // n_chains
+
+    def with_process(tl):
+        targets = [_Target(tl, remaining=rounds - 1) for _ in range(n_chains)]
+        for i, target in enumerate(targets):
+            tl.schedule(Event(i, Process(target, "round_with_process", [])))
+        return _Total(targets)
+
+    def with_scheduler(tl):
+        scheduler = AppScheduler(tl)
+        targets = [_Target(tl, scheduler, remaining=rounds - 1) for _ in range(n_chains)]
+        for i, target in enumerate(targets):
+            scheduler.schedule(i, target.round_with_scheduler)
+        return _Total(targets)
+
+    total = rounds * n_chains
+    return {
+        "Event+Process": _measure(with_process, total, rescheduling=True),
+        "AppScheduler.schedule": _measure(with_scheduler, total, rescheduling=True),
+    }
+
+
+class _Total:
+    def __init__(self, targets):
+        self.targets = targets
+
+    @property
+    def calls(self):
+        return sum(t.calls for t in self.targets)
+
+
+def _report(title, results):
+    print(f"\n{title}")
+    print(f"  {'método':<28}{'agendados/s':>15}{'executados/s':>15}")
+    for name, (scheduled, executed) in results.items():
+        scheduled = "-" if scheduled is None else f"{scheduled:,.0f}"
+        print(f"  {name:<28}{scheduled:>15}{executed:>15,.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Microbenchmark de agendamento de eventos das aplicações.")
+    parser.add_argument("--events", type=int, default=200000, help="Número de eventos por cenário (padrão: 200000)")
+    parser.add_argument("--chains", type=int, default=100, help="Número de cadeias no cenário encadeado (padrão: 100)")
+    parser.add_argument("--seed", type=int, default=0, help="Semente para os instantes dos eventos independentes")
+    args = parser.parse_args()
+
+    _report(f"Eventos independentes (N={args.events})", independent(args.events, args.seed))
+    _report(f"Eventos encadeados (N={args.events}, cadeias={args.chains})", chained(args.events, args.chains))
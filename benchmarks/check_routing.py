@@ -0,0 +1,72 @@
+"""
+check_routing.py
+
+Confere que as tabelas de encaminhamento do `CachedRouterNetTopo` são as
+mesmas do `RouterNetTopo` (inclusive nos empates) e compara o tempo de carga
+das duas topologias. Termina com erro se algum roteador tiver uma regra
+diferente.
+
+Uso:
+    python -m benchmarks.check_routing --topology qsn/net.json
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+
+from sequence.topology.router_net_topo import RouterNetTopo
+
+from qsn.topology_cache import CachedRouterNetTopo, load_tables
+
+
+def forwarding_tables(topo) -> dict:
+    """As regras de cada roteador: {roteador: {destino: próximo salto}}."""
+    return {
+        router.name: dict(router.network_manager.protocol_stack[0].forwarding_table.items())
+        for router in topo.get_nodes_by_type(RouterNetTopo.QUANTUM_ROUTER)
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compara as rotas do CachedRouterNetTopo com as do RouterNetTopo.")
+    parser.add_argument("--topology", default="qsn/net.json", help="Arquivo de topologia (padrão: qsn/net.json)")
+    args = parser.parse_args(argv)
+
+    with open(args.topology) as f:
+        topology = json.load(f)
+
+    t0 = time.perf_counter()
+    expected = forwarding_tables(RouterNetTopo(args.topology))
+    t1 = time.perf_counter()
+    with tempfile.TemporaryDirectory() as cache_dir:
+        tables = load_tables(topology, cache_dir)
+        t2 = time.perf_counter()
+        got = forwarding_tables(CachedRouterNetTopo(args.topology, tables))
+        t3 = time.perf_counter()
+        # segunda carga: tabelas lidas do cache por mmap
+        got_cached = forwarding_tables(CachedRouterNetTopo(args.topology, load_tables(topology, cache_dir)))
+        t4 = time.perf_counter()
+
+    mismatches = []
+    for label, result in (("calculadas", got), ("do cache", got_cached)):
+        for router, rules in expected.items():
+            cached = result.get(router, {})
+            for dst in sorted(set(rules) | set(cached)):
+                if rules.get(dst) != cached.get(dst):
+                    mismatches.append(f"  [{label}] {router} -> {dst}: RouterNetTopo={rules.get(dst)} "
+                                      f"CachedRouterNetTopo={cached.get(dst)}")
+    print(f"{len(expected)} roteadores, {sum(len(t) for t in expected.values())} regras")
+    print(f"RouterNetTopo {t1 - t0:.3f}s | CachedRouterNetTopo: cálculo {t2 - t1:.3f}s + carga {t3 - t2:.3f}s, "
+          f"do cache {t4 - t3:.3f}s")
+    if mismatches:
+        print("Tabelas diferentes:")
+        print("\n".join(mismatches))
+        return 1
+    print("Tabelas idênticas.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,4 @@
 from .hub_ghz_active_app import HubGHZActiveApp
 from .message_ghz_active import GHZMessageType, GHZMessage
-from .sensor_app import SensorApp
\ No newline at end of file
+from .sensor_app import SensorApp
+from .ghz_session import GHZSession
\ No newline at end of file
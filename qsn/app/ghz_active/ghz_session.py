@@ -0,0 +1,100 @@
+class GHZSession:
+    """State of a single GHZ attempt run by a hub.
+
+    A hub can run several sessions at once. Each session owns a disjoint
+    subset of the hub's sensors, its own circuit and deadline, and a share
+    of the hub's memory array (`memory_budget`).
+
+    Attributes:
+        session_id (int): Identifier of the session within its hub.
+        sensors_to_monitor (list[str]): The sensors taking part in this session.
+        start_time (int): The simulation time at which to start entanglement requests.
+        end_time (int): The simulation time at which to end entanglement attempts.
+        quantum_circuit_operations (list): The quantum operations applied to the session qubits.
+        memory_size (int): The number of memories requested per sensor.
+        min_entangled_sensors (int): The minimum number of sensors that must be entangled.
+        min_entangled_memories (int): The minimum number of entangled memories required per sensor.
+        required_qubits (int): The number of qubits required by the circuit.
+        memories_by_sensor (dict): The memory states registered for each sensor.
+        entangled_at (dict): Simulation time of the first entangled memory of each sensor.
+        classical_results (dict): Classical fallback results received, keyed by sensor name.
+        outcomes (list[int]): The measurement outcomes of the joint measurement, if any.
+        started (bool): Whether the GHZ proposals have been sent.
+        completed (bool): Whether the joint measurement was performed.
+        finished (bool): Whether the session deadline has been processed.
+        reported (bool): Whether the session result was reported to the coordinator.
+    """
+
+    def __init__(self, session_id: int, sensors_to_monitor: list, start_time=1e12, end_time=10e12,
+                 quantum_circuit_operations: list = None, memory_size: int = 1):
+        """Constructor for the GHZSession.
+
+        Args:
+            session_id (int): Identifier of the session within its hub.
+            sensors_to_monitor (list[str]): The sensors taking part in this session.
+            start_time (int): The start time for entanglement requests.
+            end_time (int): The end time for entanglement requests.
+            quantum_circuit_operations (list, optional): A list of quantum operations to be applied. Defaults to None.
+            memory_size (int): The number of memories requested per sensor. Defaults to 1.
+        """
+        self.session_id = session_id
+        self.sensors_to_monitor = list(sensors_to_monitor)
+        self.start_time = start_time
+        self.end_time = end_time
+        self.quantum_circuit_operations = quantum_circuit_operations if quantum_circuit_operations is not None else []
+        self.memory_size = memory_size
+        self.min_entangled_sensors = len(self.sensors_to_monitor) // 2
+        self.min_entangled_memories = 1
+        self.required_qubits = self._compute_required_qubits()
+        self.memories_by_sensor = {}
+        self.entangled_at = {}
+        self.classical_results = {}
+        self.outcomes = None
+        self.started = False
+        self.completed = False
+        self.finished = False
+        self.reported = False
+
+    @property
+    def memory_budget(self) -> int:
+        """The number of hub memories reserved for this session."""
+        return self.memory_size * len(self.sensors_to_monitor)
+
+    @property
+    def fallback_count(self) -> int:
+        """The number of classical fallback results received."""
+        return len(self.classical_results)
+
+    def register_memory(self, sensor_name: str, info: str):
+        """Registers a memory state for a sensor, up to `memory_size` entries.
+
+        Args:
+            sensor_name (str): The name of the sensor providing the memory info.
+            info (str): The state of the memory (e.g., "ENTANGLED").
+        """
+        if self.memories_by_sensor.get(sensor_name) is None:
+            self.memories_by_sensor[sensor_name] = []
+
+        if len(self.memories_by_sensor[sensor_name]) < self.memory_size:
+            self.memories_by_sensor[sensor_name].append(info)
+
+    def ready_sensors(self, entangled_memory_nodes) -> list:
+        """Returns the session sensors with enough entangled memories.
+
+        Args:
+            entangled_memory_nodes (Iterable[str]): Remote nodes with an entangled memory available on the hub.
+        """
+        return [
+            s for s in self.sensors_to_monitor
+            if self.memories_by_sensor.get(s, []).count("ENTANGLED") >= self.min_entangled_memories and s in entangled_memory_nodes
+        ]
+
+    def _compute_required_qubits(self) -> int:
+        rq = 1
+        try:
+            for op, *indices in self.quantum_circuit_operations:
+                if indices:
+                    rq = max(rq, max(indices) + 1)
+        except Exception:
+            pass
+        return rq
@@ -2,35 +2,36 @@ from sequence.utils import log
 from sequence.protocol import Protocol
 from sequence.components.circuit import Circuit
 from sequence.network_management.reservation import Reservation
-from sequence.kernel.event import Event
-from sequence.kernel.process import Process
+from ...utils.scheduling import AppScheduler
+from ..ghz_aggregation.message_aggregation import AggregationMessageType, AggregationMessage
 from .message_ghz_active import GHZMessageType, GHZMessage
+from .ghz_session import GHZSession
 
 
 class HubGHZActiveApp(Protocol):
     """An 'active' application for the Hub node.
 
     This application actively initiates the GHZ state creation process by
-    requesting entanglement with a list of sensor nodes.
+    requesting entanglement with a list of sensor nodes. The hub can run
+    several GHZ sessions concurrently; each session has its own sensor
+    subset, circuit and deadline, and a share of the hub's memory array.
 
     Attributes:
-        sensors_to_monitor (list[str]): A list of sensor names to monitor and entangle with.
-        memories_by_sensor (dict): A dictionary to store the memory states from each sensor.
-        min_entangled_sensors (int): The minimum number of sensors that must be entangled
-                                     to proceed with the joint measurement.
-        min_entangled_memories (int): The minimum number of entangled memories required per sensor.
-        memory_size (int): The number of memories to request for entanglement.
-        start_time (int): The simulation time at which to start entanglement requests.
-        end_time (int): The simulation time at which to end entanglement attempts.
-        quantum_circuit_operations (list): A list of quantum operations to be applied.
+        sessions (dict[int, GHZSession]): The GHZ sessions of this hub, keyed by session id.
+        memory_capacity (int): The number of memories in the hub's memory array.
+        allocated_memories (int): The number of memories reserved by unfinished sessions.
+        coordinator (str): The node hosting the network coordinator, if any.
     """
 
-    def __init__(self, owner, sensors_to_monitor: list, start_time=1e12, end_time=10e12, quantum_circuit_operations: list = None):
+    def __init__(self, owner, sensors_to_monitor: list = None, start_time=1e12, end_time=10e12, quantum_circuit_operations: list = None):
         """Constructor for the HubGHZActiveApp.
 
+        If `sensors_to_monitor` is given, a first session is created with the
+        given times and circuit. Further sessions can be added with `add_session`.
+
         Args:
             owner (Node): The hub node on which this application is installed.
-            sensors_to_monitor (list[str]): The list of sensor names to entangle with.
+            sensors_to_monitor (list[str], optional): The list of sensor names to entangle with.
             start_time (int): The start time for entanglement requests.
             end_time (int): The end time for entanglement requests.
             quantum_circuit_operations (list, optional): A list of quantum operations to be applied. Defaults to None.
@@ -38,51 +39,136 @@ class HubGHZActiveApp(Protocol):
         name = f"{owner.name}-ghz-app"
         super().__init__(owner, name)
         self.owner.protocols.append(self)
-        self.sensors_to_monitor = sensors_to_monitor
-        self.memories_by_sensor = {}
-        self.min_entangled_sensors = len(sensors_to_monitor) // 2
-        self.min_entangled_memories = 1
-        self.memory_size = 1
-        self.start_time = start_time
-        self.end_time = end_time
-        self.quantum_circuit_operations = quantum_circuit_operations if quantum_circuit_operations is not None else []
-        if self.quantum_circuit_operations:
-            log.logger.info(f"Quantum circuit loaded with operations: {self.quantum_circuit_operations}")
-        # compute required qubits from circuit and init completion flag
-        self.required_qubits = self._compute_required_qubits()
-        self.completed = False
-        log.logger.info(f"{self.owner.name} app circuit requires {self.required_qubits} qubits.")
+        self.sessions = {}
+        self.memory_capacity = len(self.owner.get_components_by_type("MemoryArray")[0])
+        self.allocated_memories = 0
+        self._session_by_sensor = {}
+        self._consumed_memories = set()
+        self._next_session_id = 0
+        self.scheduler = AppScheduler.for_timeline(self.owner.timeline)
+        self.coordinator = None
+        if sensors_to_monitor:
+            self.add_session(sensors_to_monitor, start_time, end_time, quantum_circuit_operations)
+
+    # Aggregated views over all sessions, kept for single-session callers.
+    @property
+    def sensors_to_monitor(self) -> list:
+        return [s for session in self.sessions.values() for s in session.sensors_to_monitor]
+
+    @property
+    def memories_by_sensor(self) -> dict:
+        return {s: m for session in list(self.sessions.values()) for s, m in list(session.memories_by_sensor.items())}
+
+    @property
+    def classical_results(self) -> dict:
+        return {s: r for session in list(self.sessions.values()) for s, r in list(session.classical_results.items())}
+
+    @property
+    def fallback_count(self) -> int:
+        return sum(session.fallback_count for session in list(self.sessions.values()))
+
+    @property
+    def completed(self) -> bool:
+        return bool(self.sessions) and all(session.completed for session in list(self.sessions.values()))
+
+    def set_coordinator(self, node_name: str):
+        """Sets the node whose coordinator receives this hub's session reports.
+
+        Args:
+            node_name (str): The node hosting the GHZCoordinatorApp.
+        """
+        self.coordinator = node_name
+        log.logger.info(f"{self.owner.name} app reporting to coordinator on {node_name}")
+
+    def add_session(self, sensors_to_monitor: list, start_time, end_time, quantum_circuit_operations: list = None,
+                    memory_size: int = 1) -> GHZSession:
+        """Creates a new GHZ session on this hub.
+
+        Args:
+            sensors_to_monitor (list[str]): The sensors taking part in the session.
+            start_time (int): The start time for entanglement requests.
+            end_time (int): The end time for entanglement requests.
+            quantum_circuit_operations (list, optional): A list of quantum operations to be applied. Defaults to None.
+            memory_size (int): The number of memories requested per sensor. Defaults to 1.
+
+        Returns:
+            GHZSession: The created session.
+
+        Raises:
+            ValueError: If a sensor already belongs to an unfinished session, or if
+                the hub does not have enough free memories for the session.
+        """
+        busy = [s for s in sensors_to_monitor
+                if s in self._session_by_sensor and not self._session_by_sensor[s].finished]
+        if busy:
+            raise ValueError(f"{self.owner.name} app sensors {busy} already belong to an unfinished session.")
+
+        session = GHZSession(self._next_session_id, sensors_to_monitor, start_time, end_time,
+                             quantum_circuit_operations, memory_size)
+        if self.allocated_memories + session.memory_budget > self.memory_capacity:
+            raise ValueError(
+                f"{self.owner.name} app cannot allocate {session.memory_budget} memories for a new session; "
+                f"{self.memory_capacity - self.allocated_memories} of {self.memory_capacity} are free.")
+
+        self._next_session_id += 1
+        self.allocated_memories += session.memory_budget
+        self.sessions[session.session_id] = session
+        for sensor_name in session.sensors_to_monitor:
+            self._session_by_sensor[sensor_name] = session
+
+        if session.quantum_circuit_operations:
+            log.logger.info(f"Quantum circuit loaded with operations: {session.quantum_circuit_operations}")
+        log.logger.info(f"{self.owner.name} app session {session.session_id} circuit requires {session.required_qubits} qubits.")
+        return session
 
     def start(self):
-        """Starts the process by sending GHZ proposals to all monitored sensors."""
+        """Starts every session that has not been started yet."""
         log.logger.info(f"{self.owner.name} app starting active GHZ process.")
-        
-        for sensor_name in self.sensors_to_monitor:
+        pending = [session.session_id for session in self.sessions.values() if not session.started]
+        for session_id in pending:
+            self._send_proposals(session_id)
+        # agenda de uma vez as verificações no fim da janela de cada sessão
+        self.scheduler.schedule_many(
+            (self.sessions[session_id].end_time, self.should_process_joint_measurement, session_id)
+            for session_id in pending
+        )
+
+    def start_session(self, session_id: int):
+        """Starts a single session by sending GHZ proposals to its sensors.
+
+        Args:
+            session_id (int): The id of the session to start.
+        """
+        self._send_proposals(session_id)
+        # agendar verificação única no fim da janela de entanglemento
+        self.scheduler.schedule(self.sessions[session_id].end_time, self.should_process_joint_measurement, session_id)
+
+    def _send_proposals(self, session_id: int):
+        session = self.sessions[session_id]
+        session.started = True
+        for sensor_name in session.sensors_to_monitor:
             msg = GHZMessage(
                 msg_type=GHZMessageType.PROPOSE_GHZ,
                 receiver=f"{sensor_name}-ghz-app",
-                start_time=self.start_time,
-                end_time=self.end_time,
-                hub_name=self.owner.name
+                start_time=session.start_time,
+                end_time=session.end_time,
+                hub_name=self.owner.name,
+                session_id=session_id
             )
             self.owner.send_message(sensor_name, msg)
-        
-        # agendar verificação única no fim da janela de entanglemento
-        process = Process(self, "should_process_joint_measurement", [])
-        event = Event(self.end_time, process)
-        self.owner.timeline.schedule(event)
-            
+
     def request_entanglement(self, sensor_name: str):
         """Requests entanglement with a specified sensor.
 
         Args:
             sensor_name (str): The name of the sensor to entangle with.
         """
+        session = self._session_by_sensor[sensor_name]
         self.owner.network_manager.request(
             sensor_name,
-            start_time=self.start_time,
-            end_time=self.end_time,
-            memory_size=self.memory_size,
+            start_time=session.start_time,
+            end_time=session.end_time,
+            memory_size=session.memory_size,
             target_fidelity=0.8
         )
         log.logger.info(f"{self.owner.name} app requested entanglement with {sensor_name}.")
@@ -91,61 +177,68 @@ class HubGHZActiveApp(Protocol):
         """Callback function for the memory manager.
 
         This method is called when a memory has been updated, for example, after an
-        entanglement attempt. It registers the memory state and checks if a joint
-        measurement should be performed.
+        entanglement attempt. It registers the memory state in the session of the
+        remote sensor and checks if a joint measurement should be performed.
 
         Args:
             info (MemoryInfo): An object containing information about the memory.
         """
+        # any new state (RAW after a reservation ends, or a fresh ENTANGLED) means the
+        # memory no longer holds the qubit measured by a previous session
+        self._consumed_memories.discard(info.index)
         if info.state == "ENTANGLED":
+            session = self._session_by_sensor.get(info.remote_node)
+            if session is None or session.finished:
+                return
             self.to_register_memories(info.remote_node, info.state)
+            session.entangled_at.setdefault(info.remote_node, self.owner.timeline.now())
             log.logger.info(f"{self.owner.name} app registered entangled memory from {info.remote_node}.")
             # early trigger: if we already have enough entangled sensors, run now
-            if not self.completed:
-                entangled_memory_nodes = {mi.remote_node for mi in self.owner.resource_manager.memory_manager if mi.state == "ENTANGLED"}
-                ready_sensors = [
-                    s for s in self.sensors_to_monitor
-                    if self.memories_by_sensor.get(s, []).count("ENTANGLED") >= self.min_entangled_memories and s in entangled_memory_nodes
-                ]
-                if len(ready_sensors) >= self.required_qubits:
-                    log.logger.info(f"{self.owner.name} app has {len(ready_sensors)} ready sensors; triggering joint measurement early.")
-                    self.simulate_joint_measurement()
-            
-    def simulate_joint_measurement(self):
-        """Aplica o circuito quântico customizado nas memórias emaranhadas e as mede."""
-        # 1) Determina quantos qubits o circuito exige (máximo índice + 1)
-        required_qubits = self.required_qubits if getattr(self, "required_qubits", None) else self._compute_required_qubits()
+            if not session.completed:
+                ready_sensors = session.ready_sensors(self.entangled_memory_map().keys())
+                if len(ready_sensors) >= session.required_qubits:
+                    log.logger.info(f"{self.owner.name} app session {session.session_id} has {len(ready_sensors)} ready sensors; triggering joint measurement early.")
+                    self.simulate_joint_measurement(session.session_id)
 
-        # 2) Mapeia memórias ENTANGLED por sensor remoto
+    def entangled_memory_map(self) -> dict:
+        """Maps each remote node to one entangled, not yet consumed, hub memory."""
         entangled_memory_map = {}
         for mem_info in self.owner.resource_manager.memory_manager:
-            if mem_info.state == "ENTANGLED" and mem_info.remote_node:
+            if mem_info.state == "ENTANGLED" and mem_info.remote_node and mem_info.index not in self._consumed_memories:
                 # mantém apenas uma memória por sensor remoto (primeira encontrada)
-                entangled_memory_map.setdefault(mem_info.remote_node, mem_info.memory)
+                entangled_memory_map.setdefault(mem_info.remote_node, mem_info)
+        return entangled_memory_map
+
+    def simulate_joint_measurement(self, session_id: int = 0):
+        """Aplica o circuito quântico da sessão nas memórias emaranhadas e as mede."""
+        session = self.sessions[session_id]
+        # 1) Determina quantos qubits o circuito exige (máximo índice + 1)
+        required_qubits = session.required_qubits
 
-        # 3) Sensores com emaranhamento confirmado pelo nosso tracking interno
-        entangled_sensors = [
-            s for s in self.sensors_to_monitor
-            if self.memories_by_sensor.get(s, []).count("ENTANGLED") >= self.min_entangled_memories and s in entangled_memory_map
-        ]
+        # 2) Mapeia memórias ENTANGLED por sensor remoto
+        entangled_memory_map = self.entangled_memory_map()
+
+        # 3) Sensores da sessão com emaranhamento confirmado pelo nosso tracking interno
+        entangled_sensors = session.ready_sensors(entangled_memory_map)
 
         # logs de depuração
-        log.logger.info(f"{self.owner.name} app entangled_sensors(tracked): {entangled_sensors}")
+        log.logger.info(f"{self.owner.name} app session {session_id} entangled_sensors(tracked): {entangled_sensors}")
         log.logger.info(f"{self.owner.name} app entangled_memory_map(keys): {list(entangled_memory_map.keys())}")
 
         if len(entangled_sensors) < required_qubits:
             log.logger.warning(
-                f"{self.owner.name} app has only {len(entangled_sensors)} entangled sensors; requires {required_qubits} to run the circuit.")
+                f"{self.owner.name} app session {session_id} has only {len(entangled_sensors)} entangled sensors; requires {required_qubits} to run the circuit.")
             return
 
         # 4) Seleciona exatamente os qubits necessários na ordem dos sensores
         selected_sensors = entangled_sensors[:required_qubits]
-        entangled_qubits = [entangled_memory_map[s] for s in selected_sensors]
-        log.logger.info(f"{self.owner.name} app selected sensors for circuit: {selected_sensors}")
+        selected_infos = [entangled_memory_map[s] for s in selected_sensors]
+        entangled_qubits = [mi.memory for mi in selected_infos]
+        log.logger.info(f"{self.owner.name} app session {session_id} selected sensors for circuit: {selected_sensors}")
 
         # 5) Constrói o circuito com o tamanho mínimo necessário
         circuit = Circuit(len(entangled_qubits))
-        for op, *qubits_indices in self.quantum_circuit_operations:
+        for op, *qubits_indices in session.quantum_circuit_operations:
             if all(isinstance(i, int) and i < len(entangled_qubits) for i in qubits_indices):
                 try:
                     gate_method = getattr(circuit, op.lower())
@@ -171,77 +264,114 @@ class HubGHZActiveApp(Protocol):
             log.logger.error(f"Failed to run circuit: {e}")
             return
 
+        # memórias medidas não podem ser reutilizadas por outra sessão
+        self._consumed_memories.update(mi.index for mi in selected_infos)
+
         # 8) Ordena os resultados pela ordem dos qubits selecionados
         outcomes = [int(results_map.get(key, 0)) for key in keys]
         for i, outcome in enumerate(outcomes):
             log.logger.info(f"{self.owner.name} app measured qubit {i} with outcome {outcome}.")
 
-        log.logger.info(f"{self.owner.name} app joint measurement with custom circuit completed. Outcomes: {outcomes}")
-        self.completed = True
-    
-    def should_process_joint_measurement(self):
-        """Verifica se há recursos suficientes para executar a medição conjunta e o circuito."""
-        # Requisito mínimo ditado pelo circuito
-        if self.completed:
-            return
-        required_qubits = self.required_qubits if getattr(self, "required_qubits", None) else self._compute_required_qubits()
-
-        # Sensores com ENTANGLED suficientes (pelo tracking interno) E com memória entangled disponível no hub
-        entangled_memory_nodes = {mi.remote_node for mi in self.owner.resource_manager.memory_manager if mi.state == "ENTANGLED"}
-        entangled_sensors = [
-            s for s in self.sensors_to_monitor
-            if self.memories_by_sensor.get(s, []).count("ENTANGLED") >= self.min_entangled_memories and s in entangled_memory_nodes
-        ]
-        entangled_qubits_count = len(entangled_sensors)
-
-        if entangled_qubits_count >= required_qubits:
-            log.logger.info(f"{self.owner.name} app processing joint measurement with custom circuit.")
-            self.simulate_joint_measurement()
-        else:
-            log.logger.warning(
-                f"{self.owner.name} app has only {entangled_qubits_count} entangled qubits; requires {required_qubits} to run the circuit.")
+        log.logger.info(f"{self.owner.name} app session {session_id} joint measurement with custom circuit completed. Outcomes: {outcomes}")
+        session.outcomes = outcomes
+        session.completed = True
+        self._report(session)
 
-    def _compute_required_qubits(self) -> int:
-        rq = 1
+    def should_process_joint_measurement(self, session_id: int = 0):
+        """Verifica, no fim da janela da sessão, se há recursos suficientes para executar o circuito.
+
+        Em seguida a sessão é encerrada e sua cota de memórias é liberada.
+        """
+        session = self.sessions[session_id]
         try:
-            for op, *indices in self.quantum_circuit_operations:
-                if indices:
-                    rq = max(rq, max(indices) + 1)
-        except Exception:
-            pass
-        return rq
-    
-    def should_process_fallback(self, sensor_name: str):
+            if session.completed:
+                return
+            # Requisito mínimo ditado pelo circuito
+            required_qubits = session.required_qubits
+
+            # Sensores com ENTANGLED suficientes (pelo tracking interno) E com memória entangled disponível no hub
+            entangled_sensors = session.ready_sensors(self.entangled_memory_map().keys())
+            entangled_qubits_count = len(entangled_sensors)
+
+            if entangled_qubits_count >= required_qubits:
+                log.logger.info(f"{self.owner.name} app session {session_id} processing joint measurement with custom circuit.")
+                self.simulate_joint_measurement(session_id)
+            else:
+                log.logger.warning(
+                    f"{self.owner.name} app session {session_id} has only {entangled_qubits_count} entangled qubits; requires {required_qubits} to run the circuit.")
+        finally:
+            self._finish_session(session)
+
+    def _finish_session(self, session: GHZSession):
+        if session.finished:
+            return
+        session.finished = True
+        self.allocated_memories -= session.memory_budget
+        if not session.reported:
+            self._report(session)
+
+    def _report(self, session: GHZSession):
+        """Sends the session result to the coordinator, as soon as it is known."""
+        session.reported = True
+        if self.coordinator is None:
+            return
+        self._send_to_coordinator(AggregationMessage(
+            AggregationMessageType.HUB_REPORT,
+            f"{self.coordinator}-ghz-coordinator",
+            hub_name=self.owner.name,
+            session_id=session.session_id,
+            start_time=session.start_time,
+            outcomes=session.outcomes,
+            classical_results=dict(session.classical_results),
+            pending_sessions=sum(1 for s in self.sessions.values() if not s.reported)
+        ))
+
+    def _send_to_coordinator(self, msg: AggregationMessage):
+        if self.coordinator != self.owner.name:
+            self.owner.send_message(self.coordinator, msg)
+            return
+        # coordinator on the hub node itself: there is no classical channel to deliver through
+        for protocol in self.owner.protocols:
+            if protocol.name == msg.receiver:
+                protocol.received_message(self.owner.name, msg)
+                return
+        log.logger.warning(f"{self.owner.name} app found no coordinator protocol {msg.receiver} on its own node")
+
+    def should_process_fallback(self, sensor_name: str, session_id: int = None):
         """Checks if a fallback message should be sent to a sensor.
 
-        This is triggered if the deadline is reached and no entanglement was
-        established with the given sensor.
+        This is triggered if the deadline of the sensor's session is reached and
+        no entanglement was established with the given sensor.
 
         Args:
             sensor_name (str): The name of the sensor to check.
+            session_id (int, optional): The session the sensor reported for. Defaults to the sensor's latest session.
         """
-        if self.owner.timeline.now() >= self.end_time:
-            if sensor_name in self.sensors_to_monitor and self.memories_by_sensor.get(sensor_name) is None:
+        if session_id is None:
+            session = self._session_by_sensor.get(sensor_name)
+        else:
+            session = self.sessions.get(session_id)
+        if session is None or sensor_name not in session.sensors_to_monitor:
+            return
+        if self.owner.timeline.now() >= session.end_time:
+            if session.memories_by_sensor.get(sensor_name) is None:
                 log.logger.info(f"{self.owner.name} app processing fallback for {sensor_name}.")
                 msg = GHZMessage(
                     msg_type=GHZMessageType.ATTEMPT_FAILED,
-                    receiver=f"{sensor_name}-ghz-app"
+                    receiver=f"{sensor_name}-ghz-app",
+                    session_id=session.session_id
                 )
                 self.owner.send_message(sensor_name, msg)
-                
+
     def to_register_memories(self, sensor_name: str, info: str):
-        """Registers the memory state received from a sensor.
+        """Registers the memory state received from a sensor in its session.
 
         Args:
             sensor_name (str): The name of the sensor providing the memory info.
             info (str): The state of the memory (e.g., "ENTANGLED").
         """
-        if self.memories_by_sensor.get(sensor_name) is None:
-            self.memories_by_sensor[sensor_name] = []
-        
-        if len(self.memories_by_sensor[sensor_name]) < self.memory_size:
-            self.memories_by_sensor[sensor_name].append(info)
-            
+        self._session_by_sensor[sensor_name].register_memory(sensor_name, info)
+
     def received_message(self, src: str, msg):
         """Main message handler for the protocol.
 
@@ -251,14 +381,31 @@ class HubGHZActiveApp(Protocol):
         """
         if msg.msg_type == GHZMessageType.ACEPT_GHZ:
             log.logger.info(f"{self.owner.name} app received ACEPT_GHZ message from {src}")
+            session = self.sessions.get(msg.session_id)
+            if session is None or session.finished or src not in session.sensors_to_monitor:
+                log.logger.warning(f"{self.owner.name} app ignored ACEPT_GHZ from {src} for inactive session {msg.session_id}")
+                return
             self.request_entanglement(src)
         elif msg.msg_type == GHZMessageType.STATUS_UPDATE:
-            self.should_process_fallback(src)
+            self.should_process_fallback(src, msg.session_id)
         elif msg.msg_type == GHZMessageType.CLASSICAL_FALLBACK:
             log.logger.info(f"{self.owner.name} app received CLASSICAL_FALLBACK message from {src}")
+            session = self.sessions.get(msg.session_id)
+            if session is None or src not in session.sensors_to_monitor:
+                log.logger.warning(f"{self.owner.name} app ignored CLASSICAL_FALLBACK from {src} for unknown session {msg.session_id}")
+            else:
+                session.classical_results[src] = msg.classical_result
+                if session.reported and self.coordinator is not None:
+                    self._send_to_coordinator(AggregationMessage(
+                        AggregationMessageType.FALLBACK_REPORT,
+                        f"{self.coordinator}-ghz-coordinator",
+                        hub_name=self.owner.name,
+                        session_id=session.session_id,
+                        classical_results={src: msg.classical_result}
+                    ))
         else:
             log.logger.warning(f"{self.owner.name} app received unknown message type {msg.msg_type} from {src}")
-    
+
     # This methods are required by the Protocol class but are not used in this active model.
     def get_other_reservation(self, reservation: Reservation):
         """Required by Protocol, but not used in this active model.
@@ -270,7 +417,7 @@ class HubGHZActiveApp(Protocol):
             reservation (Reservation): The reservation object.
         """
         pass
-    
+
     def get_reservation_result(self, reservation: Reservation, result: bool):
         """Callback to receive the result of a reservation request.
 
@@ -281,4 +428,4 @@ class HubGHZActiveApp(Protocol):
         if result:
             log.logger.info(f"Reservation for {reservation.responder} approved on node {self.owner.name}")
         else:
-            log.logger.info(f"Reservation for {reservation.responder} failed on node {self.owner.name}")
\ No newline at end of file
+            log.logger.info(f"Reservation for {reservation.responder} failed on node {self.owner.name}")
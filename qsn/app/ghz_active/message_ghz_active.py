@@ -27,6 +27,7 @@ class GHZMessage(Message):
         msg_type (GHZMessageType): The type of the message.
         receiver (str): The name of the protocol that will receive the message.
         hub_name (str): The name of the initiating hub node.
+        session_id (int): The hub session the message refers to.
         star_time (int): The start time for the protocol execution.
         end_time (int): The deadline for the protocol execution.
         num_memories (int): The number of memories involved.
@@ -50,7 +51,12 @@ class GHZMessage(Message):
             self.start_time = kwargs.get("start_time")
             self.end_time = kwargs.get("end_time")
             self.num_memories = kwargs.get("num_memories")
+            self.session_id = kwargs.get("session_id", 0)
+        elif msg_type in (GHZMessageType.ACEPT_GHZ, GHZMessageType.ATTEMPT_FAILED):
+            self.session_id = kwargs.get("session_id", 0)
         elif msg_type is GHZMessageType.STATUS_UPDATE:
             self.status = kwargs.get("status")
+            self.session_id = kwargs.get("session_id", 0)
         elif msg_type is GHZMessageType.CLASSICAL_FALLBACK:
-            self.classical_result = kwargs.get("classical_result")
\ No newline at end of file
+            self.classical_result = kwargs.get("classical_result")
+            self.session_id = kwargs.get("session_id", 0)
@@ -15,6 +15,7 @@ class SensorApp(Protocol):
         self.owner.protocols.append(self)
         self.hub_name = None
         self.hub_app_name = None
+        self.session_id = None
         # O estado inicial é NormalState
         self._state = NormalState(self)
 
@@ -38,7 +39,8 @@ class SensorApp(Protocol):
         msg = GHZMessage(
             msg_type=GHZMessageType.STATUS_UPDATE,
             receiver=self.hub_app_name,
-            status=info.state
+            status=info.state,
+            session_id=self.session_id
         )
         self.owner.send_message(self.hub_name, msg)
         log.logger.info(f"{self.owner.name} sent status '{info.state}' update to {self.hub_name}")
@@ -48,11 +50,16 @@ class SensorApp(Protocol):
         classical_result = self.owner.get_generator().integers(2)
         return classical_result
     
+    def set_session(self, session_id: int):
+        """Define a sessão do hub da qual o sensor participa."""
+        self.session_id = session_id
+
     def acept_ghz(self, src: str):
         """Envia uma mensagem ao hub para aceitar a proposta GHZ."""
         msg = GHZMessage(
             msg_type=GHZMessageType.ACEPT_GHZ,
-            receiver=self.hub_app_name
+            receiver=self.hub_app_name,
+            session_id=self.session_id
         )
         self.owner.send_message(self.hub_name, msg)
         log.logger.info(f"{self.owner.name} app accepted GHZ proposal from {src}")
@@ -2,6 +2,7 @@ from sequence.utils import log
 from sequence.message import Message
 from ..message_ghz_active import GHZMessageType, GHZMessage
 from .sensor_state import SensorState
+from .normal_state import NormalState
 
 class FallbackState(SensorState):
     """Estado de fallback, executa medição local e envia o resultado."""
@@ -16,12 +17,18 @@ class FallbackState(SensorState):
         msg = GHZMessage(
             GHZMessageType.CLASSICAL_FALLBACK, 
             self.app.hub_app_name, 
-            classical_result=classical_result
+            classical_result=classical_result,
+            session_id=self.app.session_id
         )
         self.app.owner.send_message(self.app.hub_name, msg)
         log.logger.info(f"{self.app.owner.name} sent classical result {classical_result} to node {self.app.hub_name}.")
 
     def handle_message(self, src: str, msg: Message):
-        """Neste estado, a maioria das mensagens é ignorada."""
+        """Uma nova proposta GHZ devolve o sensor ao estado normal; as demais mensagens são ignoradas."""
+        if msg.msg_type == GHZMessageType.PROPOSE_GHZ:
+            log.logger.info(f"{self.app.owner.name} received PROPOSE_GHZ for session {msg.session_id}. Leaving FallbackState.")
+            normal_state = NormalState(self.app)
+            self.app.transition_to(normal_state)
+            normal_state.handle_message(src, msg)
+            return
         log.logger.debug(f"{self.app.owner.name} received message in FallbackState from {src}. Ignoring.")
-        pass
@@ -8,6 +8,7 @@ class NormalState(SensorState):
     def handle_message(self, src: str, msg: Message):
         if msg.msg_type == GHZMessageType.PROPOSE_GHZ:
             self.app.set_hub_name(src)
+            self.app.set_session(msg.session_id)
             self.app.acept_ghz(src)
         elif msg.msg_type == GHZMessageType.ATTEMPT_FAILED:
             log.logger.info(f"{self.app.owner.name} received ATTEMPT_FAILED. Transitioning to FallbackState.")
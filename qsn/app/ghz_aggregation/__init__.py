@@ -0,0 +1,2 @@
+from .coordinator_app import GHZCoordinatorApp
+from .message_aggregation import AggregationMessageType, AggregationMessage
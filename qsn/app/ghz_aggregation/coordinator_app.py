@@ -0,0 +1,174 @@
+import numpy as np
+from sequence.utils import log
+from sequence.protocol import Protocol
+from ...utils.scheduling import AppScheduler
+from .message_aggregation import AggregationMessageType
+
+
+class GHZCoordinatorApp(Protocol):
+    """Network-level coordinator that aggregates the results of several hubs.
+
+    Each hub runs its GHZ sessions independently and reports to the coordinator
+    as soon as a session finishes. Reports are stored as they arrive, so the
+    per-hub results are available without waiting for the slowest hub. The
+    network-level aggregation runs once every expected hub has reported all of
+    its sessions, or at the aggregation deadline with whatever has arrived.
+    Classical fallback results that arrive after the aggregation are folded
+    into the network result.
+
+    When `fusion` is enabled, the coordinator reports a modelled estimate of
+    fusing the hub-level GHZ states through inter-hub entanglement swapping.
+    No quantum state is fused: hubs have already measured their qubits when
+    they report. Each additional hub joins the fused set with probability
+    `swap_success_prob`, drawn from the coordinator's own generator. The
+    estimated fidelity is `memory_fidelity` per measured Bell pair of the fused
+    hubs, times `swap_degradation` per successful swap.
+
+    Attributes:
+        hub_names (list[str]): The hubs expected to report.
+        deadline (int): The simulation time at which a partial aggregation is forced.
+        fusion (bool): Whether to fuse hub-level GHZ states.
+        swap_success_prob (float): Success probability of each inter-hub swap.
+        swap_degradation (float): Fidelity factor applied by each successful swap.
+        memory_fidelity (float): Fidelity of each hub-sensor Bell pair.
+        rng (numpy.random.Generator): Generator for the swap outcomes, independent of the host node.
+        reports (dict): Reports received, keyed by (hub name, session id).
+        result (dict): The network-level aggregation result, once available.
+    """
+
+    def __init__(self, owner, hub_names: list, deadline, fusion: bool = False,
+                 swap_success_prob: float = 1.0, swap_degradation: float = 1.0, memory_fidelity: float = 1.0,
+                 seed: int = 0):
+        """Constructor for the GHZCoordinatorApp.
+
+        Args:
+            owner (Node): The node on which the coordinator is installed.
+            hub_names (list[str]): The hubs expected to report.
+            deadline (int): The simulation time at which a partial aggregation is forced.
+            fusion (bool): Whether to fuse hub-level GHZ states. Defaults to False.
+            swap_success_prob (float): Success probability of each inter-hub swap. Defaults to 1.0.
+            swap_degradation (float): Fidelity factor applied by each successful swap. Defaults to 1.0.
+            memory_fidelity (float): Fidelity of each hub-sensor Bell pair. Defaults to 1.0.
+            seed (int): Seed of the coordinator's generator. Defaults to 0.
+        """
+        name = f"{owner.name}-ghz-coordinator"
+        super().__init__(owner, name)
+        self.owner.protocols.append(self)
+        self.hub_names = list(hub_names)
+        self.deadline = deadline
+        self.fusion = fusion
+        self.swap_success_prob = swap_success_prob
+        self.swap_degradation = swap_degradation
+        self.memory_fidelity = memory_fidelity
+        # gerador próprio: os sorteios do coordenador não alteram a sequência do nó que o hospeda
+        self.rng = np.random.default_rng(seed)
+        self.reports = {}
+        self.result = None
+        self._pending_sessions = {}
+        self.start_time = None
+        self.scheduler = AppScheduler.for_timeline(self.owner.timeline)
+
+    def start(self):
+        """Schedules the aggregation deadline."""
+        self.start_time = self.owner.timeline.now()
+        self.scheduler.schedule(self.deadline, self.aggregate)
+        log.logger.info(f"{self.owner.name} coordinator waiting for reports from {self.hub_names}.")
+
+    def received_message(self, src: str, msg):
+        """Main message handler for the coordinator.
+
+        Args:
+            src (str): The name of the source node of the message.
+            msg (AggregationMessage): The message object received.
+        """
+        key = (msg.hub_name, msg.session_id)
+        if msg.msg_type == AggregationMessageType.HUB_REPORT:
+            now = self.owner.timeline.now()
+            self.reports[key] = {
+                "hub": msg.hub_name,
+                "session_id": msg.session_id,
+                "outcomes": msg.outcomes,
+                "classical_results": dict(msg.classical_results),
+                "start_time": msg.start_time,
+                "received_at": now,
+                "latency": now - msg.start_time,
+            }
+            log.logger.info(f"{self.owner.name} coordinator received report from {msg.hub_name} "
+                            f"session {msg.session_id}: outcomes={msg.outcomes}.")
+            self._pending_sessions[msg.hub_name] = msg.pending_sessions
+            if self.result is None and all(self._pending_sessions.get(hub) == 0 for hub in self.hub_names):
+                self.aggregate()
+        elif msg.msg_type == AggregationMessageType.FALLBACK_REPORT:
+            if key in self.reports:
+                self.reports[key]["classical_results"].update(msg.classical_results)
+                # fallbacks chegam alguns saltos clássicos depois do relatório da sessão,
+                # em geral após a agregação; o resultado da rede é atualizado com eles
+                if self.result is not None:
+                    self.result["classical_results"].update(msg.classical_results)
+                    log.logger.info(f"{self.owner.name} coordinator added late fallbacks from {msg.hub_name} "
+                                    f"session {msg.session_id}: {msg.classical_results}.")
+        else:
+            log.logger.warning(f"{self.owner.name} coordinator received unknown message type {msg.msg_type} from {src}")
+
+    def aggregate(self):
+        """Combines the reports received so far into the network-level result."""
+        if self.result is not None:
+            return
+        now = self.owner.timeline.now()
+        reports = list(self.reports.values())
+        ghz_reports = [r for r in reports if r["outcomes"] is not None]
+
+        fused_hubs = []
+        fidelity = None
+        # um estado GHZ por hub entra na fusão: o da primeira sessão com resultado
+        candidates = {}
+        for report in ghz_reports:
+            candidates.setdefault(report["hub"], report)
+        candidates = list(candidates.values())
+        if self.fusion and len(candidates) >= 2:
+            fused = [candidates[0]]
+            for report in candidates[1:]:
+                if self.rng.random() < self.swap_success_prob:
+                    fused.append(report)
+            if len(fused) >= 2:
+                fused_hubs = [r["hub"] for r in fused]
+                bell_pairs = sum(len(r["outcomes"]) for r in fused)
+                fidelity = self.memory_fidelity ** bell_pairs * self.swap_degradation ** (len(fused) - 1)
+
+        # cada hub mediu o seu próprio estado GHZ; não há paridade de um estado fundido
+        hub_parities = {}
+        for report in ghz_reports:
+            hub_parities.setdefault(report["hub"], []).append(sum(report["outcomes"]) % 2)
+        classical_results = {s: v for r in reports for s, v in r["classical_results"].items()}
+        reported_hubs = {r["hub"] for r in reports}
+
+        self.result = {
+            "time": now,
+            "hubs_reported": sorted(reported_hubs),
+            "hubs_missing": [h for h in self.hub_names if h not in reported_hubs],
+            "ghz_hubs": sorted({r["hub"] for r in ghz_reports}),
+            "fused_hubs": fused_hubs,
+            "estimated_fusion_fidelity": fidelity,
+            "hub_parities": hub_parities,
+            "classical_results": classical_results,
+            "latency": now - min((r["start_time"] for r in reports), default=now),
+        }
+        log.logger.info(f"{self.owner.name} coordinator aggregated {len(reports)} reports: "
+                        f"ghz_hubs={self.result['ghz_hubs']} fused_hubs={fused_hubs} estimated_fidelity={fidelity} "
+                        f"missing={self.result['hubs_missing']}.")
+
+    def summary(self) -> dict:
+        """Network-level metrics: per-report latency, end-to-end latency and throughput.
+
+        Times are in ps of simulation; throughput is in reports per simulated second.
+        """
+        reports = sorted(self.reports.values(), key=lambda r: r["received_at"])
+        throughput = None
+        if reports:
+            span = reports[-1]["received_at"] - min(r["start_time"] for r in reports)
+            throughput = len(reports) / (span * 1e-12) if span > 0 else None
+        return {
+            "reports": reports,
+            "result": self.result,
+            "throughput": throughput,
+        }
@@ -0,0 +1,46 @@
+from enum import Enum, auto
+from sequence.message import Message
+
+
+class AggregationMessageType(Enum):
+    """Defines the message types exchanged between hubs and the network coordinator.
+
+    All messages travel Hub -> Coordinator.
+    """
+    HUB_REPORT = auto()       # outcome of a hub session (GHZ or deadline reached)
+    FALLBACK_REPORT = auto()  # classical fallback received by a hub after its report
+
+
+class AggregationMessage(Message):
+    """Custom message for communication between hubs and the coordinator.
+
+    Attributes:
+        msg_type (AggregationMessageType): The type of the message.
+        receiver (str): The name of the protocol that will receive the message.
+        hub_name (str): The name of the reporting hub.
+        session_id (int): The hub session the report refers to.
+        start_time (int): The start time of the hub session.
+        outcomes (list[int]): The GHZ measurement outcomes, or None if no GHZ was measured.
+        classical_results (dict): Classical fallback results, keyed by sensor name.
+        pending_sessions (int): The number of hub sessions not reported yet.
+    """
+
+    def __init__(self, msg_type: AggregationMessageType, receiver: str, **kwargs):
+        """Constructor for the AggregationMessage.
+
+        Args:
+            msg_type (AggregationMessageType): The type of the message.
+            receiver (str): The name of the protocol that will receive the message.
+            **kwargs: Keyword arguments that compose the message attributes.
+        """
+        super().__init__(msg_type, receiver)
+        self.hub_name = kwargs.get("hub_name")
+        self.session_id = kwargs.get("session_id", 0)
+
+        if msg_type is AggregationMessageType.HUB_REPORT:
+            self.start_time = kwargs.get("start_time")
+            self.outcomes = kwargs.get("outcomes")
+            self.classical_results = kwargs.get("classical_results", {})
+            self.pending_sessions = kwargs.get("pending_sessions", 0)
+        elif msg_type is AggregationMessageType.FALLBACK_REPORT:
+            self.classical_results = kwargs.get("classical_results", {})
@@ -0,0 +1,305 @@
+"""
+Cache da fase de emaranhamento.
+
+A geração de emaranhamento (reservas, geração, purificação, swapping) depende
+apenas da topologia, dos parâmetros de hardware, das sementes dos nós e da
+janela de cada sessão; o circuito do hub só entra em cena no ponto de medição
+e a lógica de `FallbackState` só quando o sensor recebe ATTEMPT_FAILED. Este
+módulo grava, durante uma execução completa:
+
+    - para cada sessão, o ponto de medição: os sensores emaranhados e quando
+      emaranharam, as memórias do hub escolhidas e os estados quânticos delas,
+      e o estado do gerador do hub;
+    - para cada sensor que entrou em fallback em cada sessão, o estado do seu
+      gerador nesse momento.
+
+Execuções seguintes com a mesma fase de emaranhamento reexecutam apenas os
+estágios de circuito e de fallback sobre os estados guardados, sem a
+timeline do SeQUeNCe. A chave inclui a largura do circuito, pois ela define
+quando o hub dispara a medição antecipada; mudar apenas as portas ou a lógica
+de fallback reaproveita a entrada. Supõe-se que nada depois da medição
+influencia a fase de emaranhamento das sessões seguintes do mesmo hub.
+
+As entradas ficam em `<cache>/entanglement` e são removidas quando ficam sem
+uso por mais de `max_age` segundos ou quando o diretório passa de `max_bytes`
+(as usadas há mais tempo saem primeiro).
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import time
+from typing import List, Optional
+
+import numpy as np
+
+from qsn.app.ghz_active import HubGHZActiveApp, SensorApp, GHZMessage, GHZMessageType
+from qsn.replay.stubs import StubMemoryInfo, StubNode, StubTimeline
+from qsn.scenario import Scenario, default_cache_dir, _atomic_write
+
+# incrementar quando o formato das entradas ou o protocolo de emaranhamento mudar
+ENTANGLEMENT_CACHE_VERSION = 1
+
+
+def entanglement_key(scenario: Scenario, hubs: Optional[List[dict]] = None) -> str:
+    """Hash de tudo o que determina a fase de emaranhamento de um cenário.
+
+    Args:
+        scenario (Scenario): O cenário carregado por `load_scenario`.
+        hubs (list[dict], optional): Hubs e sensores usados; padrão: todos os hubs do cenário.
+    """
+    operations = scenario.circuit_operations
+    content = {
+        "version": ENTANGLEMENT_CACHE_VERSION,
+        "topology": scenario.topology,  # inclui as sementes dos nós
+        "hardware": scenario.hardware,
+        "start_time": scenario.start_time,
+        "end_time": scenario.end_time,
+        "hubs": hubs if hubs is not None else scenario.hubs,
+        "required_qubits": max([max(op[1:]) + 1 for op in operations if len(op) > 1], default=1),
+    }
+    return hashlib.sha256(json.dumps(content, sort_keys=True).encode()).hexdigest()
+
+
+def _generator_state(node) -> dict:
+    # lido pelo método da classe: o `ProtocolRecorder` substitui `get_generator` na instância
+    # por um que devolve um gerador instrumentado dentro das chamadas gravadas
+    return type(node).get_generator(node).bit_generator.state
+
+
+def _restore_generator(state: dict):
+    bit_generator = getattr(np.random, state["bit_generator"])()
+    bit_generator.state = state
+    return np.random.Generator(bit_generator)
+
+
+class EntanglementCapture:
+    """Grava os resultados da fase de emaranhamento durante uma execução completa.
+
+    Attributes:
+        timeline (Timeline): A timeline da simulação.
+    """
+
+    def __init__(self, timeline):
+        self.timeline = timeline
+        self._hubs = []
+        self._snapshots = {}
+        self._fallbacks = {}
+
+    def attach(self, app):
+        """Passa a gravar o ponto de medição (hubs) ou a entrada em fallback (sensores) de uma aplicação."""
+        if isinstance(app, HubGHZActiveApp):
+            self._hubs.append(app)
+            for method_name in ("simulate_joint_measurement", "should_process_joint_measurement"):
+                self._wrap_measurement(app, method_name)
+        else:
+            self._wrap_sensor(app)
+
+    def _wrap_measurement(self, app, method_name: str):
+        method = getattr(app, method_name)
+
+        def captured(session_id: int = 0):
+            if (app.owner.name, session_id) not in self._snapshots:
+                self._snapshot(app, session_id)
+            return method(session_id)
+
+        setattr(app, method_name, captured)
+
+    def _snapshot(self, app, session_id: int):
+        session = app.sessions[session_id]
+        memory_map = app.entangled_memory_map()
+        qm = self.timeline.quantum_manager
+        memories = []
+        states = {}
+        for sensor_name in session.ready_sensors(memory_map):
+            info = memory_map[sensor_name]
+            key = info.memory.qstate_key
+            memories.append([info.index, sensor_name, key])
+            state = qm.get(key)
+            states.setdefault(tuple(state.keys), np.array(state.state))
+        self._snapshots[(app.owner.name, session_id)] = {
+            "time": self.timeline.now(),
+            "entangled_at": dict(session.entangled_at),
+            "memories_by_sensor": {s: list(m) for s, m in session.memories_by_sensor.items()},
+            "memories": memories,
+            "states": [(list(keys), state) for keys, state in states.items()],
+            "rng_state": _generator_state(app.owner),
+        }
+
+    def _wrap_sensor(self, app):
+        received_message = app.received_message
+
+        def captured(src: str, msg):
+            name = app.owner.name
+            key = (name, msg.session_id)
+            if msg.msg_type == GHZMessageType.ATTEMPT_FAILED and key not in self._fallbacks:
+                self._fallbacks[key] = {
+                    "sensor": name,
+                    "hub": app.hub_name,
+                    "session_id": msg.session_id,
+                    "time": self.timeline.now(),
+                    "rng_state": _generator_state(app.owner),
+                }
+            return received_message(src, msg)
+
+        app.received_message = captured
+
+    def entry(self) -> dict:
+        """A entrada de cache com tudo o que foi gravado."""
+        return {
+            "version": ENTANGLEMENT_CACHE_VERSION,
+            "formalism": type(self.timeline.quantum_manager).__name__,
+            "hubs": [
+                {
+                    "name": app.owner.name,
+                    "memory_capacity": app.memory_capacity,
+                    "sessions": [
+                        {"session_id": s.session_id, "sensors": s.sensors_to_monitor, "start_time": s.start_time,
+                         "end_time": s.end_time, "memory_size": s.memory_size,
+                         "snapshot": self._snapshots.get((app.owner.name, s.session_id))}
+                        for s in app.sessions.values()
+                    ],
+                }
+                for app in self._hubs
+            ],
+            "fallbacks": list(self._fallbacks.values()),
+        }
+
+
+def rerun_stages(entry: dict, circuit_operations: list, hub_cls=HubGHZActiveApp, sensor_cls=SensorApp) -> list:
+    """Reexecuta os estágios de circuito e de fallback sobre uma entrada do cache.
+
+    Cada sessão é restaurada no seu ponto de medição (estados quânticos,
+    memórias e gerador do hub) e processada como no fim da sua janela, com o
+    novo circuito. Em seguida, os sensores que entraram em fallback recebem
+    ATTEMPT_FAILED com o gerador restaurado, e suas mensagens são entregues ao hub.
+
+    Args:
+        entry (dict): Entrada gravada por `EntanglementCapture`.
+        circuit_operations (list): O circuito a aplicar; deve ter a largura usada na chave da entrada.
+        hub_cls (type): Classe usada para recriar os hubs.
+        sensor_cls (type): Classe usada para recriar os sensores em fallback.
+
+    Returns:
+        list[HubGHZActiveApp]: Os hubs recriados, com os resultados de cada sessão.
+    """
+    from sequence.kernel import quantum_manager
+
+    qm = getattr(quantum_manager, entry["formalism"])()
+    timeline = StubTimeline(qm)
+    sent = []
+    hub_apps = {}
+    for hub_info in entry["hubs"]:
+        node = StubNode(hub_info["name"], timeline, None, hub_info["memory_capacity"], sent)
+        app = hub_cls(node)
+        node.set_app(app)
+        hub_apps[node.name] = app
+        for s in hub_info["sessions"]:
+            session = app.add_session(s["sensors"], s["start_time"], s["end_time"], circuit_operations,
+                                      s["memory_size"])
+            snapshot = s["snapshot"]
+            if snapshot is None:
+                continue
+            timeline.time = snapshot["time"]
+            for keys, state in snapshot["states"]:
+                qm.set(keys, state)
+            node.memory_manager = [StubMemoryInfo(i, "ENTANGLED", r, q) for i, r, q in snapshot["memories"]]
+            node.generator = _restore_generator(snapshot["rng_state"])
+            session.memories_by_sensor = {sensor: list(m) for sensor, m in snapshot["memories_by_sensor"].items()}
+            session.entangled_at = dict(snapshot["entangled_at"])
+            app.should_process_joint_measurement(session.session_id)
+
+    for fallback in entry["fallbacks"]:
+        hub_app = hub_apps.get(fallback["hub"])
+        if hub_app is None:
+            continue
+        timeline.time = fallback["time"]
+        sensor_sent = []
+        node = StubNode(fallback["sensor"], timeline, _restore_generator(fallback["rng_state"]), 0, sensor_sent)
+        sensor = sensor_cls(node)
+        node.set_app(sensor)
+        sensor.set_hub_name(fallback["hub"])
+        sensor.set_session(fallback["session_id"])
+        sensor.received_message(fallback["hub"], GHZMessage(GHZMessageType.ATTEMPT_FAILED, sensor.name,
+                                                            session_id=fallback["session_id"]))
+        for _, src, dst, msg in sensor_sent:
+            if dst == fallback["hub"]:
+                hub_app.received_message(src, msg)
+    return list(hub_apps.values())
+
+
+class EntanglementCache:
+    """Entradas da fase de emaranhamento guardadas em disco, com remoção por tamanho e idade.
+
+    Attributes:
+        cache_dir (str): Diretório das entradas.
+        max_bytes (int): Tamanho máximo do diretório.
+        max_age (float): Tempo máximo sem uso de uma entrada, em segundos.
+        hits (int): Entradas encontradas desde a criação do objeto.
+        misses (int): Entradas ausentes ou expiradas desde a criação do objeto.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: int = 512 * 2 ** 20,
+                 max_age: float = 7 * 24 * 3600):
+        self.cache_dir = cache_dir or os.path.join(default_cache_dir(), "entanglement")
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.pickle")
+
+    def get(self, key: str) -> Optional[dict]:
+        """Retorna a entrada de `key`, ou None se ela não existir ou tiver expirado."""
+        file_name = self._file(key)
+        entry = None
+        try:
+            if time.time() - os.path.getmtime(file_name) <= self.max_age:
+                with open(file_name, "rb") as f:
+                    entry = pickle.load(f)
+                # a idade conta a partir do último uso
+                os.utime(file_name)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def put(self, key: str, entry: dict):
+        """Grava a entrada de `key` e remove as entradas que excedem os limites."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        _atomic_write(self._file(key), pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL))
+        self.evict()
+
+    def evict(self) -> int:
+        """Remove as entradas expiradas e, se preciso, as usadas há mais tempo; retorna quantas saíram."""
+        try:
+            names = [n for n in os.listdir(self.cache_dir) if n.endswith(".pickle")]
+        except OSError:
+            return 0
+        files = []
+        for name in names:
+            try:
+                st = os.stat(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue
+            files.append((st.st_mtime, st.st_size, name))
+        files.sort()
+
+        now = time.time()
+        total = sum(size for _, size, _ in files)
+        removed = 0
+        for mtime, size, name in files:
+            if now - mtime <= self.max_age and total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
@@ -0,0 +1,2 @@
+from .recorder import ProtocolRecorder
+from .engine import ReplayEngine, ReplayDivergence
@@ -0,0 +1,16 @@
+import argparse
+import json
+
+from . import ReplayEngine
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reproduz uma gravação de eventos de protocolo sem as camadas físicas.")
+    parser.add_argument("recording", help="Arquivo gravado com --record")
+    parser.add_argument("--repeat", type=int, default=1, help="Número de repetições, para medir o tempo de replay")
+    args = parser.parse_args()
+
+    for _ in range(args.repeat):
+        summary = ReplayEngine(args.recording).run()
+        print(f"Replay de {summary['entries']} entradas em {summary['elapsed'] * 1e3:.2f} ms "
+              f"({summary['messages_sent']} mensagens enviadas)")
+    print(json.dumps(summary["hubs"], indent=2))
@@ -0,0 +1,160 @@
+import gzip
+import json
+import time
+from collections import defaultdict, deque
+
+from ..app.ghz_active import HubGHZActiveApp, SensorApp, GHZMessage, GHZMessageType
+from .recorder import FORMAT_VERSION
+from .stubs import StubMemoryInfo, StubNode, StubTimeline
+
+
+class ReplayDivergence(Exception):
+    """O protocolo reproduzido pediu uma entrada diferente da gravada."""
+
+
+class _ReplayGenerator:
+    """Devolve, em ordem, os valores sorteados gravados para um nó."""
+
+    def __init__(self, node_name: str, draws: deque):
+        self.node_name = node_name
+        self.draws = draws
+
+    def __getattr__(self, name):
+        def draw(*args, **kwargs):
+            if not self.draws:
+                raise ReplayDivergence(f"{self.node_name} drew '{name}' but no recorded draw is left")
+            method, value = self.draws.popleft()
+            if method != name:
+                raise ReplayDivergence(f"{self.node_name} drew '{name}' but the recording has '{method}'")
+            return value
+
+        return draw
+
+
+class _ReplayQuantumManager:
+    """Devolve, em ordem, os resultados de `run_circuit` gravados."""
+
+    def __init__(self, results: deque):
+        self.results = results
+
+    def run_circuit(self, circuit, keys, meas_samp=None):
+        if not self.results:
+            raise ReplayDivergence("run_circuit called but no recorded result is left")
+        entry = self.results.popleft()
+        if "e" in entry:
+            raise Exception(entry["e"])
+        return {k: v for k, v in entry["v"]}
+
+
+class ReplayEngine:
+    """Reproduz um fluxo gravado por `ProtocolRecorder` sem as camadas físicas.
+
+    As aplicações são recriadas sobre nós substitutos e recebem, na ordem
+    gravada, as mesmas chamadas de início, callbacks de memória, mensagens e
+    disparos de prazo. Sorteios e resultados de circuito são servidos a partir
+    da gravação; mensagens enviadas e pedidos de emaranhamento são apenas
+    coletados, já que suas consequências estão no próprio fluxo.
+
+    Attributes:
+        header (dict): O cabeçalho da gravação.
+        entries (list[dict]): As entradas de protocolo, em ordem.
+        apps (dict): As aplicações recriadas, por nome de nó.
+        sent (list[tuple]): Mensagens enviadas durante o replay: (tempo, origem, destino, mensagem).
+    """
+
+    def __init__(self, file_name: str, hub_cls=HubGHZActiveApp, sensor_cls=SensorApp):
+        """Carrega uma gravação.
+
+        Args:
+            file_name (str): O arquivo gravado por `ProtocolRecorder.save`.
+            hub_cls (type): Classe usada para recriar os hubs (permite testar variações do protocolo).
+            sensor_cls (type): Classe usada para recriar os sensores.
+        """
+        with gzip.open(file_name, "rt") as f:
+            self.header = json.loads(f.readline())
+            records = [json.loads(line) for line in f]
+        if self.header.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported recording version {self.header.get('version')}")
+
+        draws = defaultdict(deque)
+        circuit_results = deque()
+        self.entries = []
+        for record in records:
+            if record["k"] == "rng":
+                draws[record["n"]].append((record["m"], record["v"]))
+            elif record["k"] == "circuit":
+                circuit_results.append(record)
+            else:
+                self.entries.append(record)
+
+        self._draws = draws
+        self._circuit_results = circuit_results
+        self.timeline = StubTimeline(_ReplayQuantumManager(circuit_results))
+        self.sent = []
+        self.apps = {}
+        self.nodes = {}
+        self.hub_names = []
+        for app_info in self.header["apps"]:
+            name = app_info["node"]
+            node = StubNode(name, self.timeline, _ReplayGenerator(name, draws[name]),
+                               app_info.get("memory_capacity", 0), self.sent)
+            self.nodes[name] = node
+            if app_info["type"] == "hub":
+                self.hub_names.append(name)
+                app = hub_cls(node)
+                if app_info.get("coordinator"):
+                    app.set_coordinator(app_info["coordinator"])
+                for s in app_info["sessions"]:
+                    app.add_session(s["sensors"], s["start_time"], s["end_time"],
+                                    [tuple(op) for op in s["operations"]], s["memory_size"])
+            else:
+                app = sensor_cls(node)
+            node.set_app(app)
+            self.apps[name] = app
+
+    def run(self) -> dict:
+        """Executa o replay e retorna um resumo com os resultados e o tempo gasto.
+
+        Raises:
+            ReplayDivergence: Se o protocolo pedir uma entrada diferente da gravada ou
+                terminar sem consumir todos os sorteios e resultados de circuito gravados.
+        """
+        t0 = time.perf_counter()
+        for entry in self.entries:
+            self.timeline.time = entry.get("t", self.timeline.time)
+            node = self.nodes[entry["n"]]
+            app = self.apps[entry["n"]]
+            kind = entry["k"]
+            if kind == "mm":
+                node.memory_manager = [StubMemoryInfo(i, "ENTANGLED", r, q) for i, r, q in entry["v"]]
+            elif kind == "start":
+                app.start()
+            elif kind == "memory":
+                app.get_memory(StubMemoryInfo(entry["i"], entry["s"], entry["r"], entry["q"]))
+            elif kind == "msg":
+                msg = GHZMessage(GHZMessageType[entry["type"]], app.name, **entry["f"])
+                app.received_message(entry["src"], msg)
+            elif kind == "call":
+                getattr(app, entry["m"])(*entry["a"])
+        elapsed = time.perf_counter() - t0
+
+        # um protocolo que pula sorteios ou circuitos também diverge da gravação
+        leftover = {name: len(d) for name, d in self._draws.items() if d}
+        if leftover:
+            raise ReplayDivergence(f"replay finished with unused recorded draws: {leftover}")
+        if self._circuit_results:
+            raise ReplayDivergence(f"replay finished with {len(self._circuit_results)} unused run_circuit results")
+
+        return {
+            "elapsed": elapsed,
+            "entries": len(self.entries),
+            "messages_sent": len(self.sent),
+            "hubs": {
+                name: [
+                    {"session_id": s.session_id, "completed": s.completed, "outcomes": s.outcomes,
+                     "classical_results": dict(s.classical_results)}
+                    for s in app.sessions.values()
+                ]
+                for name, app in self.apps.items() if name in self.hub_names
+            },
+        }
@@ -0,0 +1,168 @@
+import gzip
+import json
+
+from ..app.ghz_active import HubGHZActiveApp
+
+FORMAT_VERSION = 1
+
+# Métodos das aplicações agendados na timeline (executados via Process/Event).
+TIMER_METHODS = ("should_process_joint_measurement",)
+
+
+def to_builtin(value):
+    """Converte escalares e arrays do numpy para tipos serializáveis em JSON."""
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def message_fields(msg) -> dict:
+    """Atributos específicos de uma GHZMessage (os kwargs do construtor)."""
+    return {k: v for k, v in vars(msg).items() if k not in ("msg_type", "receiver", "protocol_type", "payload")}
+
+
+class _RecordingGenerator:
+    """Repassa chamadas ao gerador do nó e registra os valores sorteados."""
+
+    def __init__(self, recorder, node_name: str, generator):
+        self._recorder = recorder
+        self._node_name = node_name
+        self._generator = generator
+
+    def __getattr__(self, name):
+        method = getattr(self._generator, name)
+
+        def draw(*args, **kwargs):
+            value = method(*args, **kwargs)
+            self._recorder._append({"k": "rng", "n": self._node_name, "m": name, "v": value})
+            return value
+
+        return draw
+
+
+class ProtocolRecorder:
+    """Registra as entradas de nível de protocolo das aplicações GHZ.
+
+    São capturados, para cada aplicação anexada:
+        - chamadas de `start` e dos métodos agendados na timeline (`TIMER_METHODS`);
+        - callbacks de memória (`get_memory`) e mensagens recebidas (`received_message`);
+        - as memórias ENTANGLED visíveis no hub, quando mudam;
+        - os valores sorteados pelo gerador do nó e os resultados de `run_circuit`
+          feitos de dentro das aplicações.
+
+    As chamadas ao gerador e ao `QuantumManager` feitas pelas camadas físicas
+    (fora das aplicações) não são registradas. O fluxo é gravado em JSON lines
+    comprimido com gzip e pode ser reproduzido por `ReplayEngine`.
+
+    Attributes:
+        timeline (Timeline): A timeline da simulação gravada.
+        entries (list[dict]): As entradas registradas, em ordem.
+    """
+
+    def __init__(self, timeline):
+        self.timeline = timeline
+        self.entries = []
+        self._apps = []
+        self._depth = 0
+        self._snapshots = {}
+        self._wrap_quantum_manager(timeline.quantum_manager)
+
+    def attach(self, app):
+        """Passa a registrar as entradas de uma aplicação (deve ser chamado antes de `start`)."""
+        self._apps.append(app)
+        node = app.owner
+        generator_of = node.get_generator
+
+        def get_generator():
+            generator = generator_of()
+            if self._depth:
+                return _RecordingGenerator(self, node.name, generator)
+            return generator
+
+        node.get_generator = get_generator
+
+        self._wrap(app, "start", lambda: {"k": "start"})
+        self._wrap(app, "get_memory", lambda info: {
+            "k": "memory", "i": info.index, "s": info.state, "r": info.remote_node,
+            "q": info.memory.qstate_key})
+        self._wrap(app, "received_message", lambda src, msg: {
+            "k": "msg", "src": src, "type": msg.msg_type.name, "f": message_fields(msg)})
+        for name in TIMER_METHODS:
+            if hasattr(app, name):
+                self._wrap(app, name, lambda *args, name=name: {"k": "call", "m": name, "a": list(args)})
+
+    def _wrap(self, app, method_name: str, make_entry):
+        method = getattr(app, method_name)
+        node_name = app.owner.name
+
+        def recorded(*args):
+            self._snapshot(app)
+            entry = make_entry(*args)
+            entry["t"] = self.timeline.now()
+            entry["n"] = node_name
+            self._append(entry)
+            self._depth += 1
+            try:
+                return method(*args)
+            finally:
+                self._depth -= 1
+
+        setattr(app, method_name, recorded)
+
+    def _snapshot(self, app):
+        """Registra as memórias ENTANGLED do hub quando diferem da última gravação."""
+        if not isinstance(app, HubGHZActiveApp):
+            return
+        current = [[mi.index, mi.remote_node, mi.memory.qstate_key]
+                   for mi in app.owner.resource_manager.memory_manager if mi.state == "ENTANGLED"]
+        if self._snapshots.get(app.owner.name) != current:
+            self._snapshots[app.owner.name] = current
+            self._append({"k": "mm", "n": app.owner.name, "v": current})
+
+    def _wrap_quantum_manager(self, qm):
+        run_circuit = qm.run_circuit
+
+        def recorded_run_circuit(circuit, keys, meas_samp=None):
+            if not self._depth:
+                return run_circuit(circuit, keys, meas_samp)
+            try:
+                result = run_circuit(circuit, keys, meas_samp)
+            except Exception as e:
+                self._append({"k": "circuit", "e": str(e)})
+                raise
+            self._append({"k": "circuit", "v": [[k, v] for k, v in result.items()]})
+            return result
+
+        qm.run_circuit = recorded_run_circuit
+
+    def _append(self, entry: dict):
+        self.entries.append(entry)
+
+    def header(self) -> dict:
+        """Descreve as aplicações gravadas, para que o replay possa recriá-las."""
+        apps = []
+        for app in self._apps:
+            if isinstance(app, HubGHZActiveApp):
+                apps.append({
+                    "node": app.owner.name,
+                    "type": "hub",
+                    "memory_capacity": app.memory_capacity,
+                    "coordinator": app.coordinator,
+                    "sessions": [
+                        {"sensors": s.sensors_to_monitor, "start_time": s.start_time, "end_time": s.end_time,
+                         "operations": [list(op) for op in s.quantum_circuit_operations], "memory_size": s.memory_size}
+                        for s in app.sessions.values()
+                    ],
+                })
+            else:
+                apps.append({"node": app.owner.name, "type": "sensor"})
+        return {"version": FORMAT_VERSION, "apps": apps}
+
+    def save(self, file_name: str):
+        """Grava o cabeçalho e as entradas em `file_name` (JSON lines + gzip)."""
+        with gzip.open(file_name, "wt") as f:
+            f.write(json.dumps(self.header(), default=to_builtin) + "\n")
+            for entry in self.entries:
+                f.write(json.dumps(entry, default=to_builtin) + "\n")
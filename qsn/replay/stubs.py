@@ -0,0 +1,79 @@
+"""
+Nós e timeline substitutos para executar as aplicações GHZ sem as camadas físicas.
+
+Usados pelo `ReplayEngine` e pela reexecução dos estágios de circuito e de
+fallback a partir do cache de emaranhamento (`qsn.entanglement_cache`).
+"""
+
+
+class StubMemory:
+    __slots__ = ("qstate_key",)
+
+    def __init__(self, qstate_key):
+        self.qstate_key = qstate_key
+
+
+class StubMemoryInfo:
+    __slots__ = ("index", "state", "remote_node", "memory")
+
+    def __init__(self, index, state, remote_node, qstate_key):
+        self.index = index
+        self.state = state
+        self.remote_node = remote_node
+        self.memory = StubMemory(qstate_key)
+
+
+class StubMemoryArray:
+    def __init__(self, size: int):
+        self.size = size
+
+    def __len__(self):
+        return self.size
+
+
+class StubTimeline:
+    """Timeline mínima: o tempo é ajustado por quem a usa e eventos agendados só são guardados."""
+
+    def __init__(self, quantum_manager):
+        self.time = 0
+        self.quantum_manager = quantum_manager
+        self.scheduled = []
+
+    def now(self):
+        return self.time
+
+    def schedule(self, event):
+        self.scheduled.append(event)
+
+
+class StubNode:
+    """Nó substituto com a interface usada pelas aplicações GHZ."""
+
+    def __init__(self, name: str, timeline: StubTimeline, generator, memory_capacity: int, sent: list):
+        self.name = name
+        self.timeline = timeline
+        self.protocols = []
+        self.app = None
+        self.requests = []
+        self.memory_array = StubMemoryArray(memory_capacity)
+        self.memory_manager = []
+        self.generator = generator
+        self._sent = sent
+        # as aplicações acessam owner.resource_manager.memory_manager e owner.network_manager.request
+        self.resource_manager = self
+        self.network_manager = self
+
+    def get_components_by_type(self, component_type: str):
+        return [self.memory_array] if component_type == "MemoryArray" else []
+
+    def get_generator(self):
+        return self.generator
+
+    def set_app(self, app):
+        self.app = app
+
+    def send_message(self, dst: str, msg):
+        self._sent.append((self.timeline.now(), self.name, dst, msg))
+
+    def request(self, responder, start_time, end_time, memory_size, target_fidelity):
+        self.requests.append((self.timeline.now(), responder, start_time, end_time, memory_size, target_fidelity))
@@ -0,0 +1,192 @@
+"""
+Ponto de entrada programático da simulação.
+
+`run_scenario` é usado tanto pela linha de comando (`qsn.sensorActiveNet`)
+quanto pelo script de experimentos focados (`guia.py`).
+"""
+
+import time
+from typing import List, Optional
+
+from sequence.topology.router_net_topo import RouterNetTopo
+
+from qsn.app.ghz_active import HubGHZActiveApp, SensorApp
+from qsn.app.ghz_aggregation import GHZCoordinatorApp
+from qsn.parameters import set_parameters
+from qsn.scenario import Scenario
+from qsn.topology_cache import CachedRouterNetTopo, load_tables
+from qsn.utils.logging_setup import setup_logger
+
+
+def build_network(scenario: Scenario, hubs: Optional[List[dict]] = None, log_mode: Optional[str] = "custom", verbose: bool = False):
+    """Carrega a topologia do cenário, aplica o hardware e instala as aplicações.
+
+    Args:
+        scenario (Scenario): O cenário carregado por `load_scenario`.
+        hubs (list[dict], optional): Hubs e sensores a usar; padrão: todos os hubs do cenário.
+        log_mode (str, optional): Modo do `setup_logger`; None desativa o log.
+        verbose (bool): Se True, imprime o progresso da instalação.
+
+    Returns:
+        tuple: (CachedRouterNetTopo, lista de HubGHZActiveApp instaladas, GHZCoordinatorApp ou None).
+    """
+    hubs = hubs if hubs is not None else scenario.hubs
+
+    # as rotas vêm do cache de tabelas, em vez de um Dijkstra por par de roteadores
+    network_topo = CachedRouterNetTopo(scenario.topology_file, load_tables(scenario.topology))
+    tl = network_topo.get_timeline()
+    if log_mode is not None:
+        setup_logger(tl, scenario.log_file_name, mode=log_mode)
+    set_parameters(network_topo, scenario.hardware)
+
+    node_map = {node.name: node for node in network_topo.get_nodes_by_type(RouterNetTopo.QUANTUM_ROUTER)}
+    hub_apps = []
+    for hub_info in hubs:
+        hub_node = node_map[hub_info["name"]]
+        app_hub = HubGHZActiveApp(hub_node)
+        # hubs passados sem sessões (por exemplo, pelo guia.py) têm uma sessão com todos os sensores
+        sessions = hub_info.get("sessions") or [{"sensors": hub_info["sensors"], "start_time": scenario.start_time,
+                                                 "end_time": scenario.end_time, "memory_size": 1}]
+        for session in sessions:
+            app_hub.add_session(session["sensors"], session["start_time"], session["end_time"],
+                                scenario.circuit_operations, session["memory_size"])
+        hub_node.set_app(app_hub)
+        hub_apps.append(app_hub)
+        if verbose:
+            print(f"  Aplicação instalada no hub: {hub_node.name}")
+
+        for sensor_name in hub_info["sensors"]:
+            sensor_node = node_map[sensor_name]
+            sensor_node.set_app(SensorApp(sensor_node))
+            if verbose:
+                print(f"    Aplicação instalada no sensor: {sensor_name}")
+
+    coordinator = None
+    if scenario.aggregation is not None:
+        aggregation = scenario.aggregation
+        swapping = scenario.hardware["swapping"]
+        coordinator_node = node_map[aggregation["COORDINATOR"]]
+        coordinator = GHZCoordinatorApp(coordinator_node, [app.owner.name for app in hub_apps],
+                                        aggregation["DEADLINE"], aggregation["FUSION"],
+                                        swapping["SUCC_PROB"], swapping["DEGRADATION"],
+                                        scenario.hardware["memoria"]["FIDELITY"], aggregation["SEED"])
+        for app in hub_apps:
+            app.set_coordinator(coordinator_node.name)
+        if verbose:
+            print(f"  Coordenador de agregação instalado em: {coordinator_node.name}")
+
+    return network_topo, hub_apps, coordinator
+
+
+def collect_results(hub_apps: List[HubGHZActiveApp], coordinator: Optional[GHZCoordinatorApp] = None) -> dict:
+    """Resume os resultados de cada sessão de cada hub e, se houver, a agregação da rede."""
+    hubs = {
+        app.owner.name: [
+            {
+                "session_id": session.session_id,
+                "sensors": session.sensors_to_monitor,
+                "completed": session.completed,
+                "outcomes": session.outcomes,
+                "classical_results": {s: int(r) for s, r in session.classical_results.items()},
+            }
+            for session in app.sessions.values()
+        ]
+        for app in hub_apps
+    }
+    network = None
+    if coordinator is not None:
+        network = coordinator.summary()
+        for report in network["reports"]:
+            report["classical_results"] = {s: int(r) for s, r in report["classical_results"].items()}
+        if network["result"] is not None:
+            network["result"]["classical_results"] = {s: int(r) for s, r in network["result"]["classical_results"].items()}
+    return {"hubs": hubs, "network": network}
+
+
+def run_scenario(scenario: Scenario, hubs: Optional[List[dict]] = None, log_mode: Optional[str] = "custom",
+                 stats_file: Optional[str] = None, metrics_port: Optional[int] = None,
+                 metrics_interval: float = 1.0, verbose: bool = False, timings: Optional[dict] = None,
+                 record: Optional[str] = None, entanglement_cache=None) -> dict:
+    """Executa um cenário completo e retorna os resultados por hub.
+
+    Args:
+        scenario (Scenario): O cenário carregado por `load_scenario`.
+        hubs (list[dict], optional): Hubs e sensores a usar; padrão: todos os hubs do cenário.
+        log_mode (str, optional): Modo do `setup_logger`; None desativa o log.
+        stats_file (str, optional): Arquivo de métricas reescrito durante a execução.
+        metrics_port (int, optional): Porta local do endpoint de métricas.
+        metrics_interval (float): Intervalo entre amostras de métricas, em segundos.
+        verbose (bool): Se True, imprime o progresso da execução.
+        timings (dict, optional): Se fornecido, recebe os tempos de `setup` e `run`, em segundos.
+        record (str, optional): Arquivo onde gravar o fluxo de eventos de protocolo (ver `qsn.replay`).
+        entanglement_cache (EntanglementCache, optional): Cache da fase de emaranhamento. Se houver uma
+            entrada para o cenário, apenas os estágios de circuito e de fallback são reexecutados, sem
+            gravação, métricas nem agregação da rede; senão, a execução completa alimenta o cache.
+
+    Returns:
+        dict: Resultados por hub e da rede, no formato de `collect_results`.
+    """
+    t0 = time.perf_counter()
+    capture = None
+    if entanglement_cache is not None:
+        from qsn.entanglement_cache import EntanglementCapture, entanglement_key, rerun_stages
+        cache_key = entanglement_key(scenario, hubs)
+        entry = entanglement_cache.get(cache_key)
+        if entry is not None:
+            t1 = time.perf_counter()
+            hub_apps = rerun_stages(entry, scenario.circuit_operations)
+            if verbose:
+                print("Fase de emaranhamento reaproveitada do cache; circuito e fallback reexecutados.")
+            if timings is not None:
+                timings["setup"] = t1 - t0
+                timings["run"] = time.perf_counter() - t1
+            return collect_results(hub_apps)
+
+    network_topo, hub_apps, coordinator = build_network(scenario, hubs, log_mode, verbose)
+    tl = network_topo.get_timeline()
+
+    recorder = None
+    if record:
+        from qsn.replay import ProtocolRecorder
+        recorder = ProtocolRecorder(tl)
+        for node in network_topo.get_nodes_by_type(RouterNetTopo.QUANTUM_ROUTER):
+            if isinstance(node.app, (HubGHZActiveApp, SensorApp)):
+                recorder.attach(node.app)
+
+    if entanglement_cache is not None:
+        capture = EntanglementCapture(tl)
+        for node in network_topo.get_nodes_by_type(RouterNetTopo.QUANTUM_ROUTER):
+            if isinstance(node.app, (HubGHZActiveApp, SensorApp)):
+                capture.attach(node.app)
+
+    tl.init()
+    if coordinator is not None:
+        coordinator.start()
+    for app in hub_apps:
+        app.start()
+    t1 = time.perf_counter()
+
+    if stats_file or metrics_port is not None:
+        # importado sob demanda: threads e servidor HTTP só são necessários com monitoramento
+        from qsn.utils.metrics import TimelineMonitor
+        monitor = TimelineMonitor(tl, hub_apps, interval=metrics_interval,
+                                  stats_file=stats_file, http_port=metrics_port)
+        with monitor:
+            tl.run()
+        if verbose:
+            print(f"Métricas finais: {monitor.last_sample}")
+    else:
+        tl.run()
+
+    if recorder is not None:
+        recorder.save(record)
+        if verbose:
+            print(f"Fluxo de protocolo gravado em '{record}'.")
+
+    if capture is not None:
+        entanglement_cache.put(cache_key, capture.entry())
+
+    if timings is not None:
+        timings["setup"] = t1 - t0
+        timings["run"] = time.perf_counter() - t1
+    return collect_results(hub_apps, coordinator)
@@ -0,0 +1,377 @@
+"""
+Carregamento de cenários declarativos.
+
+Um cenário é um único arquivo JSON que descreve a simulação completa:
+
+    {
+        "simulacao": {"LOG_FILE_NAME": "log", "START_TIME": 1e12, "END_TIME": 3e12},
+        "topologia": "../net.json",
+        "hubs": [{"name": "Hub1"}, {"name": "Hub2", "sensors": ["Sensor1H2", "Sensor2H2"]}],
+        "hardware": {...},
+        "circuito_quantico": {"operacoes": [["H", 0], ["CX", 0, 1]]},
+        "agregacao": {"COORDINATOR": "Hub1", "FUSION": true, "DEADLINE": 4e12}
+    }
+
+`topologia` pode ser o caminho (relativo ao arquivo do cenário) de um arquivo
+no formato do `RouterNetTopo` ou o próprio dicionário da topologia. Quando um
+hub não declara `sensors`, seus sensores são os vizinhos quânticos que não são
+hubs, evitando repetir a lista de nós. Um hub pode declarar `sessions`, uma
+lista de sessões GHZ simultâneas, cada uma com seus `sensors` (padrão: todos os
+sensores do hub), `START_TIME`/`END_TIME` (padrão: os de `simulacao`) e
+`MEMORY_SIZE` (padrão 1); sessões de um hub não compartilham sensores e juntas
+não podem reservar mais memórias que o `memo_size` do hub. Sem `sessions`, o
+hub tem uma única sessão com todos os seus sensores. A seção `agregacao` é opcional e instala
+um coordenador que combina os resultados dos hubs; `SEED` (padrão 0) inicializa
+o gerador próprio do coordenador.
+
+O cenário validado e expandido é guardado em cache, indexado pelo hash do
+conteúdo (cenário + topologia), para que processos em lote não repitam o
+trabalho de validação e expansão.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+from typing import List, Optional
+
+QUANTUM_ROUTER = "QuantumRouter"
+
+HARDWARE_KEYS = {
+    "memoria": ("FREQ", "EXPIRE", "EFFICIENCY", "FIDELITY"),
+    "swapping": ("SUCC_PROB", "DEGRADATION"),
+    "detector": ("EFFICIENCY", "COUNT_RATE", "RESOLUTION"),
+    "canal_quantico": ("ATTENUATION",),
+}
+
+# incrementar quando a estrutura de `Scenario` mudar, para invalidar caches antigos
+CACHE_VERSION = 3
+
+DEFAULT_SCENARIO_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scenarios", "default.json")
+
+
+def _is_number(value) -> bool:
+    # bool é subclasse de int, mas `true` não é um tempo ou parâmetro válido
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _section(data: dict, key: str, expected: type, default, errors: List[str], where: str = ""):
+    """Retorna `data[key]` se tiver o tipo esperado; senão registra o erro e retorna `default`."""
+    value = data.get(key, default)
+    if not isinstance(value, expected):
+        errors.append(f"{where}{key}: esperado {'objeto' if expected is dict else 'lista'}, recebido {type(value).__name__}")
+        return default
+    return value
+
+
+class ScenarioError(ValueError):
+    """Erro de validação de um cenário; `errors` lista todos os problemas encontrados."""
+
+    def __init__(self, path: str, errors: List[str]):
+        self.path = path
+        self.errors = errors
+        details = "\n".join(f"  - {e}" for e in errors)
+        super().__init__(f"Cenário inválido '{path}':\n{details}")
+
+
+class Scenario:
+    """Cenário de simulação validado e expandido.
+
+    Attributes:
+        path (str): Caminho do arquivo de cenário.
+        content_hash (str): Hash SHA-256 do conteúdo do cenário e da topologia.
+        topology (dict): Configuração da topologia no formato do `RouterNetTopo`.
+        topology_file (str): Arquivo com a topologia expandida, usado pelo `RouterNetTopo`.
+        hubs (list[dict]): Hubs, seus sensores e suas sessões (`{"name": ..., "sensors": [...], "sessions": [...]}`),
+            cada sessão com `sensors`, `start_time`, `end_time` e `memory_size`.
+        hardware (dict): Parâmetros de hardware.
+        circuit_operations (list[tuple]): Operações do circuito quântico.
+        log_file_name (str): Nome do arquivo de log, sem extensão.
+        start_time (float): Início da janela de emaranhamento.
+        end_time (float): Fim da janela de emaranhamento.
+        aggregation (dict): Configuração do coordenador (`COORDINATOR`, `FUSION`, `DEADLINE`) ou None.
+    """
+
+    def __init__(self, path: str, content_hash: str, topology: dict, hubs: List[dict], hardware: dict,
+                 circuit_operations: List[tuple], log_file_name: str, start_time: float, end_time: float,
+                 aggregation: Optional[dict] = None):
+        self.path = path
+        self.content_hash = content_hash
+        self.topology = topology
+        self.topology_file = None
+        self.hubs = hubs
+        self.hardware = hardware
+        self.circuit_operations = circuit_operations
+        self.log_file_name = log_file_name
+        self.start_time = start_time
+        self.end_time = end_time
+        self.aggregation = aggregation
+
+    def get_hub(self, hub_name: str) -> Optional[dict]:
+        """Retorna a configuração de um hub pelo nome (ou None)."""
+        for hub_info in self.hubs:
+            if hub_info["name"] == hub_name:
+                return hub_info
+        return None
+
+
+def default_cache_dir() -> str:
+    """Diretório de cache padrão (`QSN_CACHE_DIR` ou `~/.cache/qsn`)."""
+    return os.environ.get("QSN_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "qsn"))
+
+
+def load_scenario(path: str = DEFAULT_SCENARIO_FILE, cache_dir: Optional[str] = None, use_cache: bool = True) -> Scenario:
+    """Carrega, valida e expande um arquivo de cenário.
+
+    Args:
+        path (str): Caminho do arquivo de cenário.
+        cache_dir (str, optional): Diretório do cache. Padrão: `default_cache_dir()`.
+        use_cache (bool): Se False, ignora e não atualiza o cache.
+
+    Returns:
+        Scenario: O cenário pronto para execução.
+
+    Raises:
+        ScenarioError: Se o cenário tiver qualquer erro de validação.
+    """
+    path = os.path.abspath(path)
+    with open(path, "rb") as f:
+        raw = f.read()
+    try:
+        data = json.loads(raw)
+    except json.JSONDecodeError as e:
+        raise ScenarioError(path, [f"JSON inválido: {e}"])
+
+    topology, topology_raw, errors = _read_topology(path, data)
+    if errors:
+        raise ScenarioError(path, errors)
+
+    content_hash = hashlib.sha256(raw + b"\0" + topology_raw).hexdigest()
+    cache_dir = cache_dir or default_cache_dir()
+    cache_file = os.path.join(cache_dir, f"{content_hash}.v{CACHE_VERSION}.scenario.pickle")
+
+    if use_cache:
+        scenario = _read_cache(cache_file)
+        if scenario is not None and os.path.exists(scenario.topology_file):
+            scenario.path = path
+            return scenario
+
+    scenario = _build_scenario(path, content_hash, data, topology)
+    if use_cache:
+        os.makedirs(cache_dir, exist_ok=True)
+        scenario.topology_file = os.path.join(cache_dir, f"{content_hash}.topology.json")
+        _atomic_write(scenario.topology_file, json.dumps(scenario.topology).encode())
+        _atomic_write(cache_file, pickle.dumps(scenario, protocol=pickle.HIGHEST_PROTOCOL))
+    else:
+        scenario.topology_file = _write_temp_topology(content_hash, scenario.topology)
+    return scenario
+
+
+def _read_topology(path: str, data: dict):
+    """Resolve a seção `topologia`, que pode ser um caminho ou um dicionário."""
+    if not isinstance(data, dict):
+        return None, b"", ["o cenário deve ser um objeto JSON"]
+    topology = data.get("topologia")
+    if isinstance(topology, str):
+        topology_path = os.path.join(os.path.dirname(path), topology)
+        try:
+            with open(topology_path, "rb") as f:
+                topology_raw = f.read()
+            topology = json.loads(topology_raw)
+        except (OSError, json.JSONDecodeError) as e:
+            return None, b"", [f"topologia '{topology_path}' não pôde ser lida: {e}"]
+        if not isinstance(topology, dict):
+            return None, b"", [f"topologia '{topology_path}' deve ser um objeto JSON"]
+        return topology, topology_raw, []
+    if isinstance(topology, dict):
+        return topology, b"", []
+    return None, b"", ["seção 'topologia' ausente (caminho ou objeto)"]
+
+
+def _build_scenario(path: str, content_hash: str, data: dict, topology: dict) -> Scenario:
+    """Valida todas as seções de uma vez e monta o `Scenario` expandido."""
+    errors = []
+
+    # topologia
+    nodes = _section(topology, "nodes", list, [], errors, "topologia: ")
+    routers = {n.get("name") for n in nodes
+               if isinstance(n, dict) and n.get("type") == QUANTUM_ROUTER and isinstance(n.get("name"), str)}
+    memo_sizes = {n["name"]: n.get("memo_size", 0) for n in nodes
+                  if isinstance(n, dict) and n.get("name") in routers}
+    if not routers:
+        errors.append("topologia: nenhum nó do tipo QuantumRouter")
+    neighbors = {}
+    for i, conn in enumerate(_section(topology, "qconnections", list, [], errors, "topologia: ")):
+        if not isinstance(conn, dict):
+            errors.append(f"topologia: qconnections[{i}] deve ser um objeto")
+            continue
+        n1, n2 = conn.get("node1"), conn.get("node2")
+        for n in (n1, n2):
+            if not isinstance(n, str) or n not in routers:
+                errors.append(f"topologia: qconnections[{i}] referencia nó desconhecido '{n}'")
+        if isinstance(n1, str) and isinstance(n2, str):
+            neighbors.setdefault(n1, []).append(n2)
+            neighbors.setdefault(n2, []).append(n1)
+
+    # simulação
+    sim = _section(data, "simulacao", dict, {}, errors)
+    start_time, end_time = sim.get("START_TIME"), sim.get("END_TIME")
+    if not _is_number(start_time) or not _is_number(end_time):
+        errors.append("simulacao: START_TIME e END_TIME devem ser numéricos")
+    elif start_time >= end_time:
+        errors.append(f"simulacao: START_TIME ({start_time}) deve ser menor que END_TIME ({end_time})")
+    log_file_name = sim.get("LOG_FILE_NAME", "log")
+    if not isinstance(log_file_name, str):
+        errors.append("simulacao: LOG_FILE_NAME deve ser texto")
+
+    # circuito
+    operations = []
+    circuit = _section(data, "circuito_quantico", dict, {}, errors)
+    for i, op in enumerate(_section(circuit, "operacoes", list, [], errors, "circuito_quantico: ")):
+        if (not isinstance(op, (list, tuple)) or not op or not isinstance(op[0], str)
+                or not all(isinstance(q, int) and not isinstance(q, bool) and q >= 0 for q in op[1:])):
+            errors.append(f"circuito_quantico: operacoes[{i}] deve ser [\"PORTA\", índices inteiros...], recebido {op!r}")
+            continue
+        operations.append(tuple(op))
+    required_qubits = max([max(op[1:]) + 1 for op in operations if len(op) > 1], default=1)
+
+    # hubs
+    hubs = []
+    hub_list = _section(data, "hubs", list, [], errors)
+    hub_names = {h.get("name") for h in hub_list if isinstance(h, dict) and isinstance(h.get("name"), str)}
+    owner_of = {}
+    if not hub_list:
+        errors.append("hubs: ao menos um hub deve ser declarado")
+    for i, hub_info in enumerate(hub_list):
+        hub_name = hub_info.get("name") if isinstance(hub_info, dict) else None
+        if not isinstance(hub_name, str) or hub_name not in routers:
+            errors.append(f"hubs[{i}]: hub '{hub_name}' não existe na topologia")
+            continue
+        sensors = hub_info.get("sensors")
+        if sensors is None:
+            sensors = [n for n in neighbors.get(hub_name, []) if n not in hub_names]
+        elif not isinstance(sensors, list) or not all(isinstance(n, str) for n in sensors):
+            errors.append(f"hubs[{i}]: sensors de {hub_name} deve ser uma lista de nomes")
+            continue
+        for sensor_name in sensors:
+            if sensor_name not in routers:
+                errors.append(f"hubs[{i}]: sensor '{sensor_name}' de {hub_name} não existe na topologia")
+            elif sensor_name in owner_of:
+                errors.append(f"hubs[{i}]: sensor '{sensor_name}' já pertence a {owner_of[sensor_name]}")
+            else:
+                owner_of[sensor_name] = hub_name
+        sessions = _read_sessions(hub_info, i, hub_name, sensors, start_time, end_time, required_qubits,
+                                  memo_sizes.get(hub_name, 0), errors)
+        hubs.append({"name": hub_name, "sensors": list(sensors), "sessions": sessions})
+
+    # hardware
+    hardware = _section(data, "hardware", dict, {}, errors)
+    for section, keys in HARDWARE_KEYS.items():
+        values = _section(hardware, section, dict, {}, errors, "hardware: ")
+        for key in keys:
+            if not _is_number(values.get(key)):
+                errors.append(f"hardware: '{section}.{key}' ausente ou não numérico")
+
+    # agregação entre hubs (opcional)
+    aggregation = data.get("agregacao")
+    if aggregation is not None:
+        if not isinstance(aggregation, dict):
+            errors.append(f"agregacao: esperado objeto, recebido {type(aggregation).__name__}")
+            aggregation = {}
+        coordinator = aggregation.get("COORDINATOR")
+        if not isinstance(coordinator, str) or coordinator not in routers:
+            errors.append(f"agregacao: COORDINATOR '{coordinator}' não existe na topologia")
+        else:
+            last_end = max([s["end_time"] for h in hubs for s in h["sessions"] if _is_number(s["end_time"])],
+                           default=end_time)
+            deadline = aggregation.get("DEADLINE", last_end)
+            if not _is_number(deadline):
+                errors.append("agregacao: DEADLINE deve ser numérico")
+            elif _is_number(last_end) and deadline < last_end:
+                errors.append(f"agregacao: DEADLINE ({deadline}) deve ser maior ou igual ao fim da última sessão ({last_end})")
+            seed = aggregation.get("SEED", 0)
+            if not isinstance(seed, int) or isinstance(seed, bool):
+                errors.append("agregacao: SEED deve ser inteiro")
+            aggregation = {"COORDINATOR": coordinator, "FUSION": bool(aggregation.get("FUSION", False)),
+                           "DEADLINE": deadline, "SEED": seed}
+
+    if errors:
+        raise ScenarioError(path, errors)
+
+    return Scenario(path, content_hash, topology, hubs, hardware, operations, log_file_name, start_time, end_time,
+                    aggregation)
+
+
+def _read_sessions(hub_info: dict, i: int, hub_name: str, sensors: list, start_time, end_time, required_qubits: int,
+                   memo_size, errors: List[str]) -> List[dict]:
+    """Valida e expande as sessões de um hub; sem `sessions`, uma sessão com todos os sensores."""
+    where = f"hubs[{i}]: "
+    session_list = _section(hub_info, "sessions", list, [{}], errors, where)
+    if not session_list:
+        errors.append(f"{where}sessions de {hub_name} deve ter ao menos uma sessão")
+    sessions = []
+    session_of = {}
+    for j, session_info in enumerate(session_list):
+        where = f"hubs[{i}].sessions[{j}]: "
+        if not isinstance(session_info, dict):
+            errors.append(f"{where}esperado objeto, recebido {type(session_info).__name__}")
+            continue
+        session_sensors = session_info.get("sensors", sensors)
+        if not isinstance(session_sensors, list) or not all(isinstance(n, str) for n in session_sensors):
+            errors.append(f"{where}sensors deve ser uma lista de nomes")
+            continue
+        for sensor_name in session_sensors:
+            if sensor_name not in sensors:
+                errors.append(f"{where}sensor '{sensor_name}' não é sensor de {hub_name}")
+            elif sensor_name in session_of:
+                errors.append(f"{where}sensor '{sensor_name}' já pertence à sessão {session_of[sensor_name]} de {hub_name}")
+            else:
+                session_of[sensor_name] = j
+        if len(session_sensors) < required_qubits:
+            errors.append(f"{where}{hub_name} tem {len(session_sensors)} sensores na sessão, "
+                          f"mas o circuito requer {required_qubits}")
+        session_start = session_info.get("START_TIME", start_time)
+        session_end = session_info.get("END_TIME", end_time)
+        if "START_TIME" not in session_info and "END_TIME" not in session_info:
+            pass  # a janela de `simulacao`, já validada
+        elif not _is_number(session_start) or not _is_number(session_end):
+            errors.append(f"{where}START_TIME e END_TIME devem ser numéricos")
+        elif session_start >= session_end:
+            errors.append(f"{where}START_TIME ({session_start}) deve ser menor que END_TIME ({session_end})")
+        memory_size = session_info.get("MEMORY_SIZE", 1)
+        if not isinstance(memory_size, int) or isinstance(memory_size, bool) or memory_size < 1:
+            errors.append(f"{where}MEMORY_SIZE deve ser um inteiro positivo")
+            continue
+        sessions.append({"sensors": list(session_sensors), "start_time": session_start, "end_time": session_end,
+                         "memory_size": memory_size})
+
+    # as sessões são criadas juntas e reservam memórias do hub ao mesmo tempo
+    budget = sum(s["memory_size"] * len(s["sensors"]) for s in sessions)
+    if _is_number(memo_size) and budget > memo_size:
+        errors.append(f"hubs[{i}]: as sessões de {hub_name} reservam {budget} memórias, "
+                      f"mas o hub tem memo_size {memo_size}")
+    return sessions
+
+
+def _read_cache(cache_file: str) -> Optional[Scenario]:
+    try:
+        with open(cache_file, "rb") as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        return None
+
+
+def _atomic_write(file_name: str, content: bytes):
+    # vários workers podem gravar a mesma entrada; o rename garante um arquivo completo
+    tmp_name = f"{file_name}.{os.getpid()}.tmp"
+    with open(tmp_name, "wb") as f:
+        f.write(content)
+    os.replace(tmp_name, file_name)
+
+
+def _write_temp_topology(content_hash: str, topology: dict) -> str:
+    # um arquivo por conteúdo, reescrito a cada execução sem cache, em vez de um novo por execução
+    import tempfile
+    file_name = os.path.join(tempfile.gettempdir(), f"qsn-{content_hash}.topology.json")
+    _atomic_write(file_name, json.dumps(topology).encode())
+    return file_name
@@ -1,65 +1,70 @@
-from sequence.topology.router_net_topo import RouterNetTopo
-from app.ghz_active import HubGHZActiveApp, SensorApp
-from utils import setup_logger
-# Importamos a função e o dicionário do nosso arquivo de parâmetros
-from parameters import set_parameters, CONFIG
+import argparse
+import sys
+import time
 
-if __name__ == "__main__":
-    # 1. Carregar configurações diretamente do dicionário CONFIG
-    network_file = CONFIG['simulacao']['NETWORK_CONFIG_FILE']
-    log_file_name = CONFIG['simulacao']['LOG_FILE_NAME']
-    start_time = CONFIG['simulacao']['START_TIME']
-    end_time = CONFIG['simulacao']['END_TIME']
+from qsn.scenario import DEFAULT_SCENARIO_FILE, ScenarioError, load_scenario
 
-    # 2. Configuração inicial da rede e do logger
-    print(f"Carregando a topologia do arquivo: {network_file}")
-    network_topo = RouterNetTopo(network_file)
-    tl = network_topo.get_timeline()
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Executa a simulação completa da rede de sensores.")
+    parser.add_argument("--scenario", "-s", default=DEFAULT_SCENARIO_FILE, help="Arquivo de cenário (padrão: qsn/scenarios/default.json)")
+    parser.add_argument("--no-cache", action="store_true", help="Ignora o cache de cenários")
+    parser.add_argument("--stats-file", default=None, help="Arquivo JSON reescrito periodicamente com as métricas da execução")
+    parser.add_argument("--metrics-port", type=int, default=None, help="Porta local para servir as métricas em http://127.0.0.1:<porta>/metrics")
+    parser.add_argument("--metrics-interval", type=float, default=1.0, help="Intervalo entre amostras de métricas, em segundos (padrão: 1.0)")
+    parser.add_argument("--record", default=None, help="Grava o fluxo de eventos de protocolo para replay (python -m qsn.replay)")
+    parser.add_argument("--entanglement-cache", action="store_true", help="Reaproveita a fase de emaranhamento de execuções com a mesma topologia, hardware e sementes, reexecutando só circuito e fallback")
+    parser.add_argument("--worker", action="store_true", help="Modo worker: importa uma vez e executa jobs JSON da entrada padrão (ou de --socket)")
+    parser.add_argument("--socket", default=None, help="Socket Unix atendido no modo worker")
+    args = parser.parse_args()
 
-    print("Configurando o logger para a simulação...")
-    setup_logger(tl, log_file_name, mode='custom')
+    if args.worker:
+        from qsn.worker import main as worker_main
+        worker_main(["--socket", args.socket] if args.socket else [])
+        raise SystemExit(0)
 
-    print("Configurando os parâmetros da simulação...")
-    set_parameters(network_topo)
+    # 1. Carregar e validar o cenário (antes de importar o SeQUeNCe, para falhar rápido)
+    print(f"Carregando o cenário: {args.scenario}")
+    t0 = time.perf_counter()
+    try:
+        scenario = load_scenario(args.scenario, use_cache=not args.no_cache)
+    except ScenarioError as e:
+        print(e)
+        sys.exit(1)
+    load_time = time.perf_counter() - t0
 
-    # 3. Obter todos os nós da topologia de uma vez
-    all_nodes = network_topo.get_nodes_by_type(RouterNetTopo.QUANTUM_ROUTER)
-    node_map = {node.name: node for node in all_nodes}
+    t0 = time.perf_counter()
+    from qsn.runner import run_scenario
+    import_time = time.perf_counter() - t0
 
-    # 4. Loop de instalação automática das aplicações
-    all_hubs_apps = []
-    
+    # 2. Montar a rede, instalar as aplicações e executar
     print("Instalando aplicações nos nós (Hubs e Sensores)...")
-    for hub_info in CONFIG['hubs_config']:
-        hub_name = hub_info['name']
-        sensor_names = hub_info['sensors']
-        
-        # Instala a App no Hub
-        hub_node = node_map.get(hub_name)
-        if hub_node:
-            app_hub = HubGHZActiveApp(hub_node, sensor_names, start_time, end_time)
-            hub_node.set_app(app_hub)
-            all_hubs_apps.append(app_hub)
-            print(f"  Aplicação instalada no hub: {hub_name}")
-
-        # Instala as Apps nos Sensores associados
-        for sensor_name in sensor_names:
-            sensor_node = node_map.get(sensor_name)
-            if sensor_node:
-                app_sensor = SensorApp(sensor_node)
-                sensor_node.set_app(app_sensor)
-                print(f"    Aplicação instalada no sensor: {sensor_name}")
+    timings = {}
+    entanglement_cache = None
+    if args.entanglement_cache:
+        from qsn.entanglement_cache import EntanglementCache
+        entanglement_cache = EntanglementCache()
+    results = run_scenario(scenario, stats_file=args.stats_file, metrics_port=args.metrics_port,
+                           metrics_interval=args.metrics_interval, verbose=True, timings=timings,
+                           record=args.record, entanglement_cache=entanglement_cache)
+    print("Simulação concluída.")
 
-    # 5. Inicia a simulação
-    print("\nIniciando a simulação...")
-    tl.init()
-    
-    # Inicia o processo ATIVO em todos os hubs configurados
-    for app in all_hubs_apps:
-        app.start()
+    for hub_name, sessions in results["hubs"].items():
+        for session in sessions:
+            print(f"  {hub_name} sessão {session['session_id']}: outcomes={session['outcomes']} "
+                  f"fallback={session['classical_results']}")
+    network = results["network"]
+    if network is not None:
+        for report in network["reports"]:
+            print(f"  Relatório de {report['hub']} recebido com latência {report['latency'] * 1e-12:.3f}s")
+        result = network["result"]
+        if result is not None:
+            print(f"  Rede: hubs GHZ={result['ghz_hubs']} fundidos={result['fused_hubs']} "
+                  f"fidelidade estimada={result['estimated_fusion_fidelity']} paridades={result['hub_parities']} "
+                  f"ausentes={result['hubs_missing']} latência={result['latency'] * 1e-12:.3f}s")
+        if network["throughput"] is not None:
+            print(f"  Vazão da rede: {network['throughput']:.3f} relatórios/s simulado")
+    print(f"Tempos: importação {import_time:.3f}s, cenário {load_time:.3f}s, "
+          f"preparação {timings['setup']:.3f}s, execução {timings['run']:.3f}s")
 
-    tl.run()
-    print("Simulação concluída.")
-    
-    # 6. Usa a variável de configuração na mensagem final
-    print(f"\nVerifique o arquivo '{log_file_name}.log' para ver os detalhes da execução.")
\ No newline at end of file
+    # 3. Mensagem final
+    print(f"\nVerifique o arquivo '{scenario.log_file_name}.txt' para ver os detalhes da execução.")
@@ -0,0 +1,246 @@
+"""
+Tabelas de encaminhamento pré-calculadas.
+
+O `RouterNetTopo` calcula o roteamento estático na carga da topologia com um
+Dijkstra por par de roteadores, o que domina a preparação de topologias
+geradas com milhares de nós. Aqui, as tabelas são calculadas uma única vez
+por topologia (um Dijkstra por roteador) e guardadas em
+`<cache>/topology/<hash>/`:
+
+    - `next_hop.npy`: matriz `[origem, destino]` com o índice do próximo salto
+      (-1 quando não há rota), lida com `mmap_mode="r"`; processos que usam a
+      mesma topologia compartilham as páginas pelo cache do sistema;
+    - `meta.json`: nomes dos roteadores.
+
+As rotas dependem apenas das distâncias da topologia; o hardware não entra na
+chave. A perda de cada canal continua sendo derivada da atenuação pelo próprio
+SeQUeNCe no `init()` da timeline.
+
+`CachedRouterNetTopo` instala em cada roteador uma tabela que consulta a
+matriz sob demanda, em vez de inserir todas as regras. Ele também expande as
+conexões quânticas com os atrasos clássicos indexados pelo par de nós, em vez
+de percorrer todos os canais clássicos a cada conexão, de modo que a
+preparação não cresce com o quadrado do número de nós. As rotas e os canais
+gerados são os mesmos do `RouterNetTopo`, inclusive nos empates.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from collections.abc import MutableMapping
+from typing import Optional
+
+import networkx as nx
+import numpy as np
+from sequence.topology.router_net_topo import RouterNetTopo
+
+from qsn.scenario import default_cache_dir
+
+# incrementar quando o formato das tabelas mudar
+TOPOLOGY_CACHE_VERSION = 1
+
+MEET_IN_THE_MIDDLE = "meet_in_the_middle"
+
+
+def topology_key(topology: dict) -> str:
+    """Hash da topologia que determina as tabelas."""
+    content = {"version": TOPOLOGY_CACHE_VERSION, "topology": topology}
+    return hashlib.sha256(json.dumps(content, sort_keys=True).encode()).hexdigest()
+
+
+class ForwardingTable(MutableMapping):
+    """Tabela de encaminhamento de um roteador, lida sob demanda da matriz de próximos saltos.
+
+    Regras adicionadas ou removidas depois da carga ficam em memória e têm
+    precedência sobre a matriz.
+    """
+
+    _REMOVED = object()
+
+    def __init__(self, row, router_names: list, router_index: dict):
+        self._row = row
+        self._names = router_names
+        self._index = router_index
+        self._overrides = {}
+
+    def __getitem__(self, dst: str) -> str:
+        if dst in self._overrides:
+            next_hop = self._overrides[dst]
+            if next_hop is self._REMOVED:
+                raise KeyError(dst)
+            return next_hop
+        hop = int(self._row[self._index[dst]]) if dst in self._index else -1
+        if hop < 0:
+            raise KeyError(dst)
+        return self._names[hop]
+
+    def __setitem__(self, dst: str, next_hop: str):
+        self._overrides[dst] = next_hop
+
+    def __delitem__(self, dst: str):
+        self[dst]  # KeyError se não houver regra
+        self._overrides[dst] = self._REMOVED
+
+    def __iter__(self):
+        for dst in self._overrides:
+            if self._overrides[dst] is not self._REMOVED:
+                yield dst
+        for i in np.flatnonzero(np.asarray(self._row) >= 0):
+            dst = self._names[i]
+            if dst not in self._overrides:
+                yield dst
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+class TopologyTables:
+    """Próximos saltos de uma topologia.
+
+    Attributes:
+        router_names (list[str]): Os roteadores quânticos, na ordem da topologia.
+        router_index (dict): Índice de cada roteador em `router_names`.
+        next_hop (numpy.ndarray): Matriz `[origem, destino]` de índices do próximo salto (-1 sem rota).
+    """
+
+    def __init__(self, router_names: list, next_hop):
+        self.router_names = router_names
+        self.router_index = {name: i for i, name in enumerate(router_names)}
+        self.next_hop = next_hop
+
+    @classmethod
+    def build(cls, topology: dict) -> "TopologyTables":
+        """Calcula as tabelas a partir da configuração da topologia."""
+        router_names = [n["name"] for n in topology.get("nodes", []) if n.get("type") == RouterNetTopo.QUANTUM_ROUTER]
+
+        # mesmo grafo do RouterNetTopo: o custo de dois roteadores ligados por um BSM é a soma
+        # das distâncias dos seus canais; as conexões geram canais de distance // 2 depois dos explícitos
+        channels = [(qc["source"], qc["destination"], qc["distance"]) for qc in topology.get("qchannels", [])]
+        for conn in topology.get("qconnections", []):
+            if conn.get("type") != MEET_IN_THE_MIDDLE:
+                continue
+            node1, node2 = conn["node1"], conn["node2"]
+            half = conn["distance"] // 2
+            bsm = f"BSM.{node1}.{node2}.auto"
+            channels += [(node1, bsm, half), (node2, bsm, half)]
+
+        graph = nx.Graph()
+        graph.add_nodes_from(router_names)
+        costs = {}
+        for router, bsm, distance in channels:
+            if bsm not in costs:
+                costs[bsm] = [router, distance]
+            else:
+                costs[bsm] = [router] + costs[bsm]
+                costs[bsm][-1] += distance
+        graph.add_weighted_edges_from(c for c in costs.values() if len(c) == 3)
+
+        # o RouterNetTopo usa o caminho do menor para o maior nome (invertido no sentido oposto);
+        # um Dijkstra por origem fornece os dois sentidos
+        index = {name: i for i, name in enumerate(router_names)}
+        next_hop = np.full((len(router_names), len(router_names)), -1, dtype=np.int32)
+        for src in router_names:
+            paths = nx.single_source_dijkstra_path(graph, src)
+            for dst, path in paths.items():
+                if dst > src:
+                    next_hop[index[src], index[dst]] = index[path[1]]
+                    next_hop[index[dst], index[src]] = index[path[-2]]
+        return cls(router_names, next_hop)
+
+    @classmethod
+    def load(cls, directory: str) -> Optional["TopologyTables"]:
+        """Carrega tabelas gravadas por `save`, com a matriz de próximos saltos mapeada em memória."""
+        try:
+            with open(os.path.join(directory, "meta.json")) as f:
+                meta = json.load(f)
+            next_hop = np.load(os.path.join(directory, "next_hop.npy"), mmap_mode="r")
+        except (OSError, ValueError):
+            return None
+        return cls(meta["routers"], next_hop)
+
+    def save(self, directory: str):
+        """Grava as tabelas em `directory` (criado de forma atômica)."""
+        parent = os.path.dirname(directory)
+        os.makedirs(parent, exist_ok=True)
+        tmp_dir = f"{directory}.{os.getpid()}.tmp"
+        os.makedirs(tmp_dir, exist_ok=True)
+        np.save(os.path.join(tmp_dir, "next_hop.npy"), self.next_hop)
+        with open(os.path.join(tmp_dir, "meta.json"), "w") as f:
+            json.dump({"routers": self.router_names}, f)
+        try:
+            os.rename(tmp_dir, directory)
+        except OSError:
+            # outro processo gravou as mesmas tabelas primeiro
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def forwarding_table(self, router_name: str) -> ForwardingTable:
+        """A tabela de encaminhamento de um roteador."""
+        return ForwardingTable(self.next_hop[self.router_index[router_name]], self.router_names, self.router_index)
+
+
+def load_tables(topology: dict, cache_dir: Optional[str] = None, use_cache: bool = True) -> TopologyTables:
+    """Retorna as tabelas da topologia, calculando e gravando-as no cache se preciso.
+
+    Args:
+        topology (dict): Configuração da topologia no formato do `RouterNetTopo`.
+        cache_dir (str, optional): Diretório do cache. Padrão: `default_cache_dir()`.
+        use_cache (bool): Se False, apenas calcula as tabelas.
+    """
+    if not use_cache:
+        return TopologyTables.build(topology)
+    directory = os.path.join(cache_dir or default_cache_dir(), "topology", topology_key(topology))
+    tables = TopologyTables.load(directory)
+    if tables is None:
+        tables = TopologyTables.build(topology)
+        try:
+            tables.save(directory)
+        except OSError:
+            # cache indisponível (por exemplo, sem permissão de escrita): segue com as tabelas em memória
+            pass
+    return tables
+
+
+class CachedRouterNetTopo(RouterNetTopo):
+    """`RouterNetTopo` que usa tabelas de encaminhamento pré-calculadas.
+
+    Attributes:
+        tables (TopologyTables): As tabelas da topologia.
+    """
+
+    def __init__(self, conf_file_name: str, tables: TopologyTables):
+        self.tables = tables
+        super().__init__(conf_file_name)
+
+    def _add_qconnections(self, config: dict):
+        # o RouterNetTopo procura, para cada conexão quântica, os canais e conexões clássicas
+        # entre o mesmo par em toda a configuração (O(Q·C)); aqui eles são indexados pelo par
+        # uma única vez e cada conexão é expandida pelo próprio SeQUeNCe só com os do seu par
+        def pair(a, b):
+            return (a, b) if a <= b else (b, a)
+
+        cchannels = config.setdefault(self.ALL_C_CHANNEL, [])
+        config.setdefault(self.ALL_Q_CHANNEL, [])
+        channels_by_pair = {}
+        for cc in cchannels:
+            channels_by_pair.setdefault(pair(cc[self.SRC], cc[self.DST]), []).append(cc)
+        connections_by_pair = {}
+        for cc in config.get(self.ALL_C_CONNECT, []):
+            connections_by_pair.setdefault(pair(cc[self.CONNECT_NODE_1], cc[self.CONNECT_NODE_2]), []).append(cc)
+
+        for q_connect in config.get(self.ALL_Q_CONNECT, []):
+            key = pair(q_connect[self.CONNECT_NODE_1], q_connect[self.CONNECT_NODE_2])
+            pair_channels = channels_by_pair.get(key, [])
+            # nós e canais quânticos gerados vão direto para as listas da configuração
+            sub_config = dict(config)
+            sub_config[self.ALL_Q_CONNECT] = [q_connect]
+            sub_config[self.ALL_C_CHANNEL] = list(pair_channels)
+            sub_config[self.ALL_C_CONNECT] = connections_by_pair.get(key, [])
+            super()._add_qconnections(sub_config)
+            cchannels.extend(sub_config[self.ALL_C_CHANNEL][len(pair_channels):])
+
+    def _generate_forwarding_table(self, config: dict):
+        for router in self.nodes[self.QUANTUM_ROUTER]:
+            # o protocolo de roteamento fica na base da pilha
+            routing_protocol = router.network_manager.protocol_stack[0]
+            routing_protocol.forwarding_table = self.tables.forwarding_table(router.name)
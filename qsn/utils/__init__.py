@@ -1 +1,14 @@
-from .logging_setup import setup_logger
\ No newline at end of file
+# Os submódulos são importados sob demanda para não carregar o SeQUeNCe
+# (logging_setup) nem o servidor HTTP (metrics) antes de serem usados.
+
+def __getattr__(name):
+    if name == "setup_logger":
+        from .logging_setup import setup_logger
+        return setup_logger
+    if name == "TimelineMonitor":
+        from .metrics import TimelineMonitor
+        return TimelineMonitor
+    if name == "AppScheduler":
+        from .scheduling import AppScheduler
+        return AppScheduler
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
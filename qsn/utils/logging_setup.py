@@ -38,4 +38,22 @@ def setup_logger(timeline, log_file_name: str, mode: str = 'custom'):
             seq_log.track_module(module_name)
 
     else:
-        raise ValueError(f"Modo de log '{mode}' desconhecido. Use 'custom' ou 'verbose'.")
\ No newline at end of file
+        raise ValueError(f"Modo de log '{mode}' desconhecido. Use 'custom' ou 'verbose'.")
+
+def reset_logger():
+    """
+    Desfaz o `setup_logger` no logger do SeQUeNCe.
+
+    Remove os filtros (que guardam a timeline da simulação) e fecha os handlers,
+    deixando apenas um NullHandler. Processos que executam vários cenários
+    devem chamá-la ao fim de cada um, para não manter as redes anteriores vivas
+    nem continuar escrevendo no arquivo de log do cenário anterior.
+    """
+    logger = seq_log.logger
+    for log_filter in list(logger.filters):
+        logger.removeFilter(log_filter)
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+    logger.addHandler(logging.NullHandler())
+    logger.setLevel(logging.NOTSET)
@@ -0,0 +1,174 @@
+# metrics.py
+
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+
+try:
+    import psutil
+except ImportError:  # psutil é opcional; usamos resource como alternativa
+    psutil = None
+
+
+def _current_rss() -> Optional[int]:
+    """Retorna o RSS do processo atual em bytes (ou None se indisponível)."""
+    if psutil is not None:
+        return psutil.Process(os.getpid()).memory_info().rss
+    try:
+        # sem psutil, no Linux: o segundo campo de statm é o RSS em páginas
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _max_rss() -> Optional[int]:
+    """Retorna o pico de RSS do processo em bytes (ou None se indisponível)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss é dado em KiB no Linux e em bytes no macOS
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+class TimelineMonitor:
+    """Amostra periodicamente uma timeline em execução e publica as métricas.
+
+    A amostragem é feita em uma thread separada, que apenas lê contadores
+    da timeline e das aplicações dos hubs. Nenhum evento é agendado na
+    timeline, portanto o laço de eventos não é afetado.
+
+    As métricas podem ser lidas por:
+        - um arquivo JSON reescrito atomicamente a cada amostra (`stats_file`);
+        - um endpoint HTTP local (`http_port`), em `GET /metrics`.
+
+    Attributes:
+        timeline (Timeline): A timeline monitorada.
+        hub_apps (list): Aplicações dos hubs cujos contadores são reportados.
+        interval (float): Intervalo entre amostras, em segundos de relógio.
+        stats_file (str): Caminho do arquivo de estatísticas (opcional).
+        http_port (int): Porta do endpoint HTTP local (opcional).
+        last_sample (dict): A amostra mais recente.
+    """
+
+    def __init__(self, timeline, hub_apps: List = None, interval: float = 1.0,
+                 stats_file: Optional[str] = None, http_port: Optional[int] = None,
+                 http_host: str = "127.0.0.1"):
+        self.timeline = timeline
+        self.hub_apps = hub_apps if hub_apps is not None else []
+        self.interval = interval
+        self.stats_file = stats_file
+        self.http_port = http_port
+        self.http_host = http_host
+        self.last_sample = {}
+        self._stop = threading.Event()
+        self._thread = None
+        self._server = None
+        self._last_wall = None
+        self._last_events = 0
+        self._start_wall = None
+
+    def start(self):
+        """Inicia a thread de amostragem e, se configurado, o servidor HTTP.
+
+        Raises:
+            OSError: Se a porta do servidor HTTP não puder ser usada; nesse caso nada fica em execução.
+        """
+        # a porta é reservada antes de a thread existir: se falhar, `__exit__` não roda e nada fica para trás
+        if self.http_port is not None:
+            self._server = ThreadingHTTPServer((self.http_host, self.http_port), self._make_handler())
+        self._start_wall = self._last_wall = time.perf_counter()
+        self._last_events = self.timeline.run_counter
+        self.sample()
+        self._thread = threading.Thread(target=self._loop, name="qsn-metrics", daemon=True)
+        self._thread.start()
+        if self._server is not None:
+            threading.Thread(target=self._server.serve_forever, name="qsn-metrics-http", daemon=True).start()
+
+    def stop(self):
+        """Para a amostragem, grava uma amostra final e encerra o servidor."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.sample()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def sample(self) -> dict:
+        """Coleta uma amostra das métricas e a publica no arquivo de estatísticas."""
+        now_wall = time.perf_counter()
+        run_counter = self.timeline.run_counter
+        elapsed = now_wall - self._last_wall if self._last_wall is not None else 0
+        events_per_second = (run_counter - self._last_events) / elapsed if elapsed > 0 else 0.0
+        self._last_wall = now_wall
+        self._last_events = run_counter
+
+        sample = {
+            "wall_time": (now_wall - self._start_wall) if self._start_wall is not None else 0.0,
+            "sim_time": self.timeline.now(),
+            "events_processed": run_counter,
+            "events_per_second": events_per_second,
+            "queue_length": len(self.timeline.events),
+            "rss_bytes": _current_rss(),
+            "max_rss_bytes": _max_rss(),
+            "hubs": {app.owner.name: self._hub_stats(app) for app in self.hub_apps},
+        }
+        self.last_sample = sample
+        if self.stats_file:
+            self._write_stats_file(sample)
+        return sample
+
+    @staticmethod
+    def _hub_stats(app) -> dict:
+        return {
+            "entangled": len(app.memories_by_sensor),
+            "fallback": app.fallback_count,
+            "completed": app.completed,
+            "sessions": len(app.sessions),
+            "completed_sessions": sum(1 for session in list(app.sessions.values()) if session.completed),
+        }
+
+    def _write_stats_file(self, sample: dict):
+        # escreve em arquivo temporário e renomeia, para leitores nunca verem um JSON parcial
+        tmp_name = f"{self.stats_file}.tmp"
+        with open(tmp_name, "w") as f:
+            json.dump(sample, f)
+        os.replace(tmp_name, self.stats_file)
+
+    def _make_handler(self):
+        monitor = self
+
+        class _MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = json.dumps(monitor.last_sample).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return _MetricsHandler
@@ -0,0 +1,184 @@
+# scheduling.py
+
+import math
+from heapq import heapify, heappush
+from typing import Callable, Iterable, List, NamedTuple, Tuple
+
+
+class BoundEvent:
+    """Evento da timeline que guarda diretamente o método a ser executado.
+
+    Compatível com a interface de `Event` usada pela timeline do SeQUeNCe
+    (`time`, `priority`, `process.run()`, `is_invalid()` e comparações),
+    mas sem o `Process` intermediário nem a busca do método por nome via
+    `getattr`. O próprio evento faz o papel de `process`.
+
+    Instâncias são reaproveitadas pelo `AppScheduler`: após a execução, o
+    evento volta ao pool e `generation` é incrementado, o que invalida os
+    `EventHandle` emitidos antes do reuso.
+    """
+
+    __slots__ = ("time", "priority", "method", "args", "generation", "_is_removed", "_scheduler")
+
+    def __init__(self, scheduler):
+        self._scheduler = scheduler
+        self.generation = 0
+        self.time = 0
+        self.priority = math.inf
+        self.method = None
+        self.args = ()
+        self._is_removed = False
+
+    @property
+    def process(self):
+        return self
+
+    # atributos de Process lidos pela timeline em mensagens de log
+    @property
+    def owner(self):
+        return getattr(self.method, "__self__", None)
+
+    @property
+    def activation(self):
+        return getattr(self.method, "__name__", repr(self.method))
+
+    def run(self):
+        method, args = self.method, self.args
+        self._scheduler._release(self)
+        method(*args)
+
+    def is_invalid(self) -> bool:
+        return self._is_removed
+
+    def set_invalid(self):
+        self._is_removed = True
+
+    def __eq__(self, other):
+        return self.time == other.time and self.priority == other.priority
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __lt__(self, other):
+        return self.time < other.time or (self.time == other.time and self.priority < other.priority)
+
+    def __gt__(self, other):
+        return self.time > other.time or (self.time == other.time and self.priority > other.priority)
+
+    __hash__ = object.__hash__
+
+
+class EventHandle(NamedTuple):
+    """Referência a um agendamento; continua segura depois que o evento volta ao pool."""
+
+    event: BoundEvent
+    generation: int
+
+
+# cria o handle sem passar pelo __new__ (em Python) do NamedTuple, que pesa no agendamento
+_tuple_new = tuple.__new__
+
+
+class AppScheduler:
+    """Agenda chamadas de métodos das aplicações na timeline usando eventos reaproveitados.
+
+    Use `AppScheduler.for_timeline(tl)` para compartilhar o mesmo pool entre
+    todas as aplicações de uma timeline. O agendador compartilhado fica na
+    própria timeline, de modo que os dois são liberados juntos.
+
+    Attributes:
+        timeline (Timeline): A timeline onde os eventos são agendados.
+        max_pool_size (int): Número máximo de eventos livres guardados para reuso.
+    """
+
+    _TIMELINE_ATTR = "_qsn_app_scheduler"
+
+    def __init__(self, timeline, max_pool_size: int = 4096):
+        self.timeline = timeline
+        self.max_pool_size = max_pool_size
+        self._pool = []
+
+    @classmethod
+    def for_timeline(cls, timeline) -> "AppScheduler":
+        """Retorna o agendador compartilhado de uma timeline (criando-o se necessário)."""
+        scheduler = getattr(timeline, cls._TIMELINE_ATTR, None)
+        if scheduler is None:
+            scheduler = cls(timeline)
+            setattr(timeline, cls._TIMELINE_ATTR, scheduler)
+        return scheduler
+
+    def _acquire(self, time, method: Callable, args: tuple, priority) -> BoundEvent:
+        event = self._pool.pop() if self._pool else BoundEvent(self)
+        event.time = time
+        event.priority = priority
+        event.method = method
+        event.args = args
+        event._is_removed = False
+        return event
+
+    def _release(self, event: BoundEvent):
+        event.method = None
+        event.args = ()
+        event.generation += 1
+        if len(self._pool) < self.max_pool_size:
+            self._pool.append(event)
+
+    def schedule(self, time, method: Callable, *args, priority=math.inf) -> EventHandle:
+        """Agenda `method(*args)` para o instante `time`.
+
+        Args:
+            time (int): Instante de execução (em ps).
+            method (Callable): Método ligado (ex.: `self.should_process_joint_measurement`).
+            *args: Argumentos passados ao método.
+            priority (int): Prioridade do evento entre eventos no mesmo instante.
+
+        Returns:
+            EventHandle: Referência ao agendamento, que pode ser passada a `cancel`.
+        """
+        event = self._acquire(time, method, args, priority)
+        self.timeline.schedule(event)
+        return _tuple_new(EventHandle, (event, event.generation))
+
+    def schedule_many(self, calls: Iterable[Tuple], priority=math.inf) -> List[EventHandle]:
+        """Agenda vários eventos de uma vez.
+
+        Args:
+            calls (Iterable[tuple]): Tuplas `(time, method, *args)`.
+            priority (int): Prioridade comum a todos os eventos.
+
+        Returns:
+            list[EventHandle]: Referências aos agendamentos, na ordem de `calls`.
+        """
+        events = [self._acquire(time, method, tuple(args), priority) for time, method, *args in calls]
+        now = self.timeline.now()
+        for event in events:
+            if event.time < now:
+                message = f"cannot schedule {event.activation} at {event.time}, before current time {now}"
+                # nada foi agendado: os eventos voltam ao pool
+                for acquired in events:
+                    self._release(acquired)
+                raise ValueError(message)
+        event_list = getattr(self.timeline, "events", None)
+        heap = getattr(event_list, "data", None)
+        if isinstance(heap, list) and hasattr(self.timeline, "schedule_counter") and len(events) > 1:
+            # inserção em lote na heap da EventList: O(n + k) em vez de k * O(log n)
+            if len(events) * 4 > len(heap):
+                heap.extend(events)
+                heapify(heap)
+            else:
+                for event in events:
+                    heappush(heap, event)
+            self.timeline.schedule_counter += len(events)
+        else:
+            schedule = self.timeline.schedule
+            for event in events:
+                schedule(event)
+        return [_tuple_new(EventHandle, (event, event.generation)) for event in events]
+
+    def cancel(self, handle: EventHandle):
+        """Invalida um agendamento ainda não executado; a timeline o descarta ao retirá-lo da fila.
+
+        Não tem efeito se o evento já foi executado, mesmo que tenha sido reaproveitado depois.
+        """
+        if handle.event.generation == handle.generation:
+            handle.event.set_invalid()
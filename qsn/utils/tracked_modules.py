@@ -7,5 +7,6 @@ TRACKED_MODULES = [
     "hub_ghz_active_app",
     "sensor_ghz_active_app",
     "message_ghz_active",
-    "sensor_ghz_active_fallback_app"
+    "sensor_ghz_active_fallback_app",
+    "coordinator_app"
 ]
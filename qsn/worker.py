@@ -0,0 +1,138 @@
+"""
+Modo worker persistente.
+
+O worker importa o SeQUeNCe e as aplicações uma única vez e depois executa
+vários cenários, recebidos como linhas JSON pela entrada padrão ou por um
+socket Unix local. Cada job tem o formato:
+
+    {"id": "job-1", "scenario": "qsn/scenarios/default.json",
+     "hubs": [{"name": "Hub1", "sensors": ["Sensor1H1", "Sensor2H1"]}],
+     "log_mode": null, "entanglement_cache": true}
+
+Apenas `scenario` é obrigatório. Com `entanglement_cache`, jobs que só mudam
+o circuito reaproveitam a fase de emaranhamento (ver `qsn.entanglement_cache`).
+Para cada job é escrita uma linha JSON de resposta com os resultados e os
+tempos de preparação (`load`, `setup`) e de execução (`run`). Ao iniciar, o
+worker escreve uma linha `ready` com o tempo gasto nas importações.
+
+Uso:
+    python -m qsn.worker                      # jobs pela entrada padrão
+    python -m qsn.worker --socket /tmp/qsn.sock
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+_entanglement_cache = None
+
+
+def _import_runtime() -> float:
+    """Importa o executor (e o SeQUeNCe) e retorna o tempo gasto, em segundos."""
+    t0 = time.perf_counter()
+    import qsn.runner  # noqa: F401
+    return time.perf_counter() - t0
+
+
+def run_job(job: dict) -> dict:
+    """Executa um job e retorna a resposta a ser enviada ao cliente."""
+    from qsn.runner import run_scenario
+    from qsn.scenario import load_scenario
+    from qsn.utils.logging_setup import reset_logger
+
+    response = {"id": job.get("id")}
+    try:
+        t0 = time.perf_counter()
+        scenario = load_scenario(job["scenario"], use_cache=job.get("use_cache", True))
+        timings = {"load": time.perf_counter() - t0}
+        results = run_scenario(scenario, hubs=job.get("hubs"), log_mode=job.get("log_mode"), timings=timings,
+                               entanglement_cache=_get_entanglement_cache() if job.get("entanglement_cache") else None)
+    except Exception as e:
+        response.update(ok=False, error=f"{type(e).__name__}: {e}")
+        return response
+    finally:
+        # o logger do SeQUeNCe é global: sem isso, cada job deixaria um filtro com a sua timeline
+        reset_logger()
+    response.update(ok=True, results=results, timings=timings)
+    return response
+
+
+def _get_entanglement_cache():
+    global _entanglement_cache
+    if _entanglement_cache is None:
+        from qsn.entanglement_cache import EntanglementCache
+        _entanglement_cache = EntanglementCache()
+    return _entanglement_cache
+
+
+def serve_stream(reader, writer):
+    """Lê jobs (uma linha JSON por job) de `reader` e escreve as respostas em `writer`."""
+    for line in reader:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            job = json.loads(line)
+        except json.JSONDecodeError as e:
+            response = {"id": None, "ok": False, "error": f"JSON inválido: {e}"}
+        else:
+            response = run_job(job)
+        writer.write(json.dumps(response) + "\n")
+        writer.flush()
+
+
+def serve_socket(socket_path: str, ready: dict):
+    """Atende jobs em um socket Unix; cada conexão pode enviar vários jobs.
+
+    As conexões são atendidas uma de cada vez, pois o logger do SeQUeNCe é global.
+    """
+    import socketserver
+
+    class _JobHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            writer = _TextWriter(self.wfile)
+            writer.write(json.dumps(ready) + "\n")
+            writer.flush()
+            serve_stream((line.decode() for line in self.rfile), writer)
+
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    with socketserver.UnixStreamServer(socket_path, _JobHandler) as server:
+        try:
+            server.serve_forever()
+        finally:
+            os.unlink(socket_path)
+
+
+class _TextWriter:
+    """Adapta um arquivo binário de socket à interface de escrita de texto."""
+
+    def __init__(self, wfile):
+        self.wfile = wfile
+
+    def write(self, text: str):
+        self.wfile.write(text.encode())
+
+    def flush(self):
+        self.wfile.flush()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Executa cenários em um worker persistente.")
+    parser.add_argument("--socket", default=None, help="Caminho de um socket Unix; padrão: entrada/saída padrão")
+    args = parser.parse_args(argv)
+
+    ready = {"event": "ready", "pid": os.getpid(), "import_time": _import_runtime()}
+    if args.socket:
+        print(json.dumps(ready), flush=True)
+        serve_socket(args.socket, ready)
+    else:
+        sys.stdout.write(json.dumps(ready) + "\n")
+        sys.stdout.flush()
+        serve_stream(sys.stdin, sys.stdout)
+
+
+if __name__ == "__main__":
+    main()